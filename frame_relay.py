@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Per-host frame relay for co-located agents.
+
+The relay keeps a single subscribed WebSocket to the game server and fans the
+game state frames out to local MCP servers over a Unix socket. Each local
+agent gets its own action-only upstream connection (`/ws?subscribe=0`) so
+joins, name checks and disconnect cleanup still work per player, but only one
+full state stream crosses the network no matter how many agents run here.
+
+Frames are conflated per client: a slow client always receives the newest
+frame instead of a growing backlog, capped at --client-fps.
+
+Wire format on the Unix socket is one JSON message per line in both
+directions (the same messages that travel over the game WebSocket).
+
+Usage:
+    uv run frame_relay.py --socket /tmp/ctf_relay.sock
+    uv run mcp_server.py --relay-socket /tmp/ctf_relay.sock
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional, Set
+
+import websockets
+
+# Maximum size of a single message on the Unix socket
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+def relay_log(event: str, details: str):
+    """Log relay events to file"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_entry = f"{timestamp} component=frame_relay event={event} {details}\n"
+
+    # Get log path from environment variable, default to logs/frame_relay.log
+    log_path = os.getenv("RELAY_LOG_PATH", "logs/frame_relay.log")
+
+    try:
+        with open(log_path, "a") as f:
+            f.write(log_entry)
+    except Exception as e:
+        print(f"Error writing to log file: {e}")
+        print(log_entry.strip())
+
+
+class RelayClient:
+    """One local agent process connected to the relay"""
+
+    def __init__(self, relay: "FrameRelay", reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.relay = relay
+        self.reader = reader
+        self.writer = writer
+        self.pending_frame: Optional[bytes] = None
+        self.control = deque()  # messages that must not be conflated (errors)
+        self.wakeup = asyncio.Event()
+        self.upstream = None
+        self.closed = False
+
+    def push_frame(self, frame: bytes):
+        self.pending_frame = frame
+        self.wakeup.set()
+
+    def push_control(self, message: bytes):
+        self.control.append(message)
+        self.wakeup.set()
+
+    async def run(self):
+        writer_task = asyncio.create_task(self._write_loop())
+        try:
+            await self._read_loop()
+        finally:
+            self.closed = True
+            writer_task.cancel()
+            if self.upstream is not None:
+                await self.upstream.close()
+            self.writer.close()
+
+    async def _read_loop(self):
+        """Forward joins and actions from the agent to its upstream connection"""
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            if self.upstream is None:
+                self.upstream = await websockets.connect(f"{self.relay.ws_url}?subscribe=0")
+                asyncio.create_task(self._upstream_loop(self.upstream))
+            await self.upstream.send(line.rstrip(b"\n").decode())
+
+    async def _upstream_loop(self, upstream):
+        """Pass messages sent on the action connection (join errors) back to the agent"""
+        try:
+            async for message in upstream:
+                if isinstance(message, str):
+                    message = message.encode()
+                self.push_control(message)
+        except Exception as e:
+            relay_log("upstream_error", f"connection=action details={str(e)}")
+        finally:
+            # The player is gone on the server side; make the agent notice
+            if not self.closed:
+                self.writer.close()
+
+    async def _write_loop(self):
+        min_interval = 1.0 / self.relay.client_fps if self.relay.client_fps > 0 else 0.0
+        last_frame_time = 0.0
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            while self.control:
+                self.writer.write(self.control.popleft() + b"\n")
+            if self.pending_frame is not None:
+                delay = min_interval - (time.monotonic() - last_frame_time)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                frame, self.pending_frame = self.pending_frame, None
+                self.writer.write(frame + b"\n")
+                last_frame_time = time.monotonic()
+            await self.writer.drain()
+
+
+class FrameRelay:
+    def __init__(self, server_url: str, socket_path: str, client_fps: float):
+        self.ws_url = f"ws://{server_url}/ws"
+        self.socket_path = socket_path
+        self.client_fps = client_fps
+        self.clients: Set[RelayClient] = set()
+        self.latest_frame: Optional[bytes] = None
+
+    async def run(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path, limit=STREAM_LIMIT)
+        relay_log("relay_started", f"socket={self.socket_path} upstream={self.ws_url}")
+        async with server:
+            await self._subscribe()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = RelayClient(self, reader, writer)
+        self.clients.add(client)
+        relay_log("client_connected", f"clients={len(self.clients)}")
+        if self.latest_frame is not None:
+            client.push_frame(self.latest_frame)
+        try:
+            await client.run()
+        except Exception as e:
+            relay_log("client_error", f"details={str(e)}")
+        finally:
+            self.clients.discard(client)
+            relay_log("client_disconnected", f"clients={len(self.clients)}")
+
+    async def _subscribe(self):
+        """Hold the single upstream subscription, reconnecting with backoff"""
+        delay = 0.5
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, max_size=None) as websocket:
+                    relay_log("upstream_connected", f"url={self.ws_url}")
+                    delay = 0.5
+                    async for message in websocket:
+                        frame = message.encode() if isinstance(message, str) else message
+                        self.latest_frame = frame
+                        for client in self.clients:
+                            client.push_frame(frame)
+            except Exception as e:
+                relay_log("upstream_error", f"connection=subscription details={str(e)}")
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, 10.0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Capture the Flag per-host frame relay")
+    parser.add_argument("--server-url", default=os.getenv("GAME_SERVER_URL", "localhost:8080"),
+                        help="Game server host:port (default: $GAME_SERVER_URL or localhost:8080)")
+    parser.add_argument("--socket", default="/tmp/ctf_relay.sock",
+                        help="Unix socket path local agents connect to (default: /tmp/ctf_relay.sock)")
+    parser.add_argument("--client-fps", type=float, default=20.0,
+                        help="Maximum frames per second sent to each agent, 0 for every frame (default: 20)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"📡 Relaying {args.server_url} to {args.socket}")
+    asyncio.run(FrameRelay(args.server_url, args.socket, args.client_fps).run())
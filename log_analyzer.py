@@ -0,0 +1,789 @@
+#!/usr/bin/env python3
+"""
+Streaming analyzer for mcp_server.log and game_server.log.
+
+Both components write one event per line:
+    2025-01-01 12:00:00 component=mcp_server event=tool_executed tool=attack agent=Red1 ...
+
+The analyzer reads the logs line by line in bounded memory, keeps an on-disk
+index of byte offsets and partial aggregates per time window so repeated or
+filtered queries only parse new bytes, and can follow the files across log
+rotation.
+
+Examples:
+    python log_analyzer.py logs/mcp_server.log logs/game_server.log
+    python log_analyzer.py logs/*.log --agent RedPlayer1 --since "2025-01-01 12:00:00"
+    python log_analyzer.py logs/*.log --follow --report-interval 30
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, List, Set, Tuple
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMESTAMP_LENGTH = 19
+
+# Index configuration
+INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 3
+DEFAULT_WINDOW_SECONDS = 60
+
+# A gap this long between game server events starts a new match (15 min game)
+MATCH_GAP_SECONDS = 900
+
+# Every log line starts with `<timestamp> component=<name> event=<type>`
+HEADER_PATTERN = re.compile(rb"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) component=(\S+) event=(\S+)")
+# Keys naming the agent (mcp_server) or player id (game server) a line is about
+AGENT_PATTERN = re.compile(rb" (?:agent|agent_name|player_id|eliminated_by)=([^ \r\n]+)")
+# Game server events that carry a player name for its id
+JOIN_EVENTS = (b"player_joined", b"player_rejoined")
+# Events the analyzer aggregates; other lines are counted without being parsed
+AGGREGATED_EVENTS = {b"tool_executed", b"websocket_reconnected", b"rate_limit_hit",
+                     b"player_eliminated", b"flag_captured", b"team_chat"}
+# Fields of aggregated game server events kept in cached windows
+GAME_FIELDS = ("player_id", "eliminated_by", "red_score", "blue_score")
+
+_last_timestamp: Tuple[bytes, float] = (b"", 0.0)
+
+
+def parse_header(raw: bytes) -> Optional[Tuple[float, bytes, bytes]]:
+    """
+    Timestamp, component and event of a raw log line without parsing the rest.
+
+    Returns:
+        (unix timestamp, component, event) or None if the line is not an event line
+    """
+    global _last_timestamp
+    header = HEADER_PATTERN.match(raw)
+    if header is None:
+        return None
+    stamp, component, event = header.groups()
+    if stamp == _last_timestamp[0]:
+        return _last_timestamp[1], component, event
+    # strptime dominates header cost; consecutive lines mostly share a second
+    try:
+        ts = time.mktime(time.strptime(stamp.decode("ascii"), TIMESTAMP_FORMAT))
+    except ValueError:
+        return None
+    _last_timestamp = (stamp, ts)
+    return ts, component, event
+
+
+def parse_fields(raw: bytes) -> Dict[str, str]:
+    """
+    Parse the `key=value ...` part of a raw log line.
+
+    Values may contain spaces (team chat messages, error details); tokens
+    without '=' are appended to the previous value.
+    """
+    fields: Dict[str, str] = {}
+    last_key = None
+    for token in raw[TIMESTAMP_LENGTH + 1:].decode("utf-8", "replace").rstrip("\r\n").split(" "):
+        key, sep, value = token.partition("=")
+        if sep and key.isidentifier():
+            fields[key] = value
+            last_key = key
+        elif last_key is not None:
+            fields[last_key] += " " + token
+    return fields
+
+
+def parse_time(value: str) -> float:
+    """Parse a --since/--until argument (log timestamp format)"""
+    return time.mktime(time.strptime(value, TIMESTAMP_FORMAT))
+
+
+def format_time(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime(TIMESTAMP_FORMAT)
+
+
+# Aggregation
+class LatencyHistogram:
+    """
+    Mergeable latency distribution in bounded memory.
+
+    Values below 100 ms are kept exactly, larger ones rounded to two
+    significant digits (at most a few hundred buckets), so per-window
+    histograms cached in the index merge into the same percentiles a full
+    scan reports.
+    """
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = counts or {}
+
+    def add(self, value: int, count: int = 1):
+        if value >= 100:
+            value = round(value, 2 - len(str(value)))
+        self.counts[value] = self.counts.get(value, 0) + count
+
+    def merge(self, other: "LatencyHistogram"):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def percentile(self, p: float) -> float:
+        total = sum(self.counts.values())
+        if not total:
+            return 0.0
+        k = min(total - 1, max(0, int(round(p / 100.0 * (total - 1)))))
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen > k:
+                return float(value)
+        return 0.0
+
+
+class AgentStats:
+    def __init__(self):
+        self.tool_latency: Dict[str, LatencyHistogram] = {}
+        self.tool_calls: Dict[str, int] = {}
+        self.tool_failures: Dict[str, int] = {}
+        self.blocked_moves = 0
+        self.blocked_move_ms = 0
+        self.rate_limit_hits = 0
+        self.rate_limit_per_minute: Dict[int, int] = {}
+        self.reconnects = 0
+        self.downtime_ms = 0
+
+    def add_event(self, ts: float, event: str, fields: Dict[str, str]):
+        """Aggregate one mcp_server event of this agent"""
+        if event == "tool_executed":
+            tool = fields.get("tool", "unknown")
+            try:
+                latency = int(fields.get("execution_time_ms", "0"))
+            except ValueError:
+                latency = 0
+            self.tool_calls[tool] = self.tool_calls.get(tool, 0) + 1
+            if tool not in self.tool_latency:
+                self.tool_latency[tool] = LatencyHistogram()
+            self.tool_latency[tool].add(latency)
+            if fields.get("success") == "false":
+                self.tool_failures[tool] = self.tool_failures.get(tool, 0) + 1
+            if tool == "move_to_position" and fields.get("details", "").startswith("blocked"):
+                self.blocked_moves += 1
+                self.blocked_move_ms += latency
+        elif event == "websocket_reconnected":
+            self.reconnects += 1
+            try:
+                self.downtime_ms += int(fields.get("downtime_ms", "0"))
+            except ValueError:
+                pass
+        elif event == "rate_limit_hit":
+            self.rate_limit_hits += 1
+            minute = int(ts) // 60
+            self.rate_limit_per_minute[minute] = self.rate_limit_per_minute.get(minute, 0) + 1
+            self._trim_rate_limits()
+
+    def _trim_rate_limits(self):
+        # Keep the per-minute histogram bounded
+        while len(self.rate_limit_per_minute) > 1440:
+            del self.rate_limit_per_minute[min(self.rate_limit_per_minute)]
+
+    def merge(self, other: "AgentStats"):
+        for tool, calls in other.tool_calls.items():
+            self.tool_calls[tool] = self.tool_calls.get(tool, 0) + calls
+            if tool not in self.tool_latency:
+                self.tool_latency[tool] = LatencyHistogram()
+            self.tool_latency[tool].merge(other.tool_latency[tool])
+        for tool, failures in other.tool_failures.items():
+            self.tool_failures[tool] = self.tool_failures.get(tool, 0) + failures
+        self.blocked_moves += other.blocked_moves
+        self.blocked_move_ms += other.blocked_move_ms
+        self.rate_limit_hits += other.rate_limit_hits
+        for minute, hits in other.rate_limit_per_minute.items():
+            self.rate_limit_per_minute[minute] = self.rate_limit_per_minute.get(minute, 0) + hits
+        self._trim_rate_limits()
+        self.reconnects += other.reconnects
+        self.downtime_ms += other.downtime_ms
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "tools": {tool: [calls, self.tool_failures.get(tool, 0), self.tool_latency[tool].counts]
+                      for tool, calls in self.tool_calls.items()},
+            "blocked": [self.blocked_moves, self.blocked_move_ms],
+            "rate_limit": [self.rate_limit_hits, self.rate_limit_per_minute],
+            "reconnects": [self.reconnects, self.downtime_ms],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "AgentStats":
+        stats = cls()
+        for tool, (calls, failures, counts) in data["tools"].items():
+            stats.tool_calls[tool] = calls
+            if failures:
+                stats.tool_failures[tool] = failures
+            stats.tool_latency[tool] = LatencyHistogram({int(value): n for value, n in counts.items()})
+        stats.blocked_moves, stats.blocked_move_ms = data["blocked"]
+        stats.rate_limit_hits = data["rate_limit"][0]
+        stats.rate_limit_per_minute = {int(minute): n for minute, n in data["rate_limit"][1].items()}
+        stats.reconnects, stats.downtime_ms = data["reconnects"]
+        return stats
+
+    def summary(self) -> Dict[str, Any]:
+        tools = {}
+        for tool, calls in sorted(self.tool_calls.items()):
+            latency = self.tool_latency[tool]
+            tools[tool] = {
+                "calls": calls,
+                "failures": self.tool_failures.get(tool, 0),
+                "p50_ms": latency.percentile(50),
+                "p90_ms": latency.percentile(90),
+                "p99_ms": latency.percentile(99),
+            }
+        return {
+            "tools": tools,
+            "blocked_moves": self.blocked_moves,
+            "blocked_move_ms": self.blocked_move_ms,
+            "rate_limit_hits": self.rate_limit_hits,
+            "rate_limit_peak_per_minute": max(self.rate_limit_per_minute.values(), default=0),
+            "reconnects": self.reconnects,
+            "downtime_ms": self.downtime_ms,
+        }
+
+
+class MatchStats:
+    def __init__(self, start: float):
+        self.start = start
+        self.end = start
+        self.red_score = 0
+        self.blue_score = 0
+        self.timeline: List[Dict[str, Any]] = []
+        self.eliminations: Dict[str, int] = {}
+        self.captures: Dict[str, int] = {}
+        self.chat_messages = 0
+
+    def summary(self, names: Dict[str, str]) -> Dict[str, Any]:
+        def name(pid):
+            return names.get(pid, pid)
+
+        return {
+            "start": format_time(self.start),
+            "duration_s": int(self.end - self.start),
+            "score": {"red": self.red_score, "blue": self.blue_score},
+            "eliminations": {name(p): n for p, n in sorted(self.eliminations.items(), key=lambda kv: -kv[1])},
+            "captures": {name(p): n for p, n in sorted(self.captures.items(), key=lambda kv: -kv[1])},
+            "chat_messages": self.chat_messages,
+            "timeline": [dict(e, player=name(e["player"]), **({"by": name(e["by"])} if "by" in e else {}))
+                         for e in self.timeline],
+        }
+
+
+class WindowGroup:
+    """Partial aggregates of the lines in one window that share the same agent keys"""
+
+    def __init__(self):
+        self.events = 0
+        self.server_span: Optional[List[float]] = None  # first and last game server timestamps
+        self.game_events: List[List[Any]] = []  # [line number in window, ts, event, fields]
+        self.agents: Dict[str, AgentStats] = {}
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "server": self.server_span,
+            "game": self.game_events,
+            "agents": {agent: stats.to_json() for agent, stats in self.agents.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "WindowGroup":
+        group = cls()
+        group.events = data["events"]
+        group.server_span = data["server"]
+        group.game_events = data["game"]
+        group.agents = {agent: AgentStats.from_json(stats) for agent, stats in data["agents"].items()}
+        return group
+
+
+class WindowStats:
+    """
+    Unfiltered partial aggregates of one index window.
+
+    Lines are grouped by their agent keys (agent names or player ids), so an
+    --agent filter can still be applied to cached windows. Game server
+    events are kept individually (they are rare) and replayed in order, and
+    the first/last game server timestamps reproduce the match boundaries.
+    """
+
+    def __init__(self):
+        self.lines = 0
+        self.groups: Dict[bytes, WindowGroup] = {}
+
+    def add(self, raw: bytes, ts: float, component: bytes, event: bytes, keys: List[bytes]):
+        self.lines += 1
+        key = keys[0] if len(keys) == 1 else b" ".join(sorted(set(keys)))
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = WindowGroup()
+        group.events += 1
+        if component == b"server":
+            if group.server_span is None:
+                group.server_span = [ts, ts]
+            else:
+                group.server_span[1] = ts
+            if event in AGGREGATED_EVENTS:
+                fields = parse_fields(raw)
+                game_fields = {name: fields[name] for name in GAME_FIELDS if name in fields}
+                group.game_events.append([self.lines, ts, event.decode(), game_fields])
+        elif component == b"mcp_server" and event in AGGREGATED_EVENTS:
+            fields = parse_fields(raw)
+            agent = fields.get("agent", "unknown")
+            stats = group.agents.get(agent)
+            if stats is None:
+                stats = group.agents[agent] = AgentStats()
+            stats.add_event(ts, event.decode(), fields)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"lines": self.lines,
+                "groups": {key.decode("utf-8", "replace"): group.to_json() for key, group in self.groups.items()}}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "WindowStats":
+        stats = cls()
+        stats.lines = data["lines"]
+        stats.groups = {key.encode(): WindowGroup.from_json(group) for key, group in data["groups"].items()}
+        return stats
+
+
+# Offset index
+class LogIndex:
+    """
+    Byte offsets and partial aggregates of time windows in a single log file.
+
+    Each window entry is [window_start, offset, [agents...], WindowStats].
+    Reports merge the cached aggregates of windows entirely inside the
+    requested time range and only reread the (at most two) windows cut by
+    --since/--until. The index also keeps every player id -> name seen in
+    join events, so name filters and reports can resolve game server ids
+    without rereading skipped windows.
+    It is stored next to the log as `<log>.idx.json` and is extended
+    incrementally: only bytes past `indexed_size` are scanned on the next run.
+    A changed inode or a shrunk file (rotation/truncation) invalidates it.
+    """
+
+    def __init__(self, log_path: str, window_seconds: int = DEFAULT_WINDOW_SECONDS):
+        self.log_path = log_path
+        self.index_path = log_path + INDEX_SUFFIX
+        self.window_seconds = window_seconds
+        self.inode: Optional[int] = None
+        self.indexed_size = 0
+        self.windows: List[List[Any]] = []
+        self.player_names: Dict[str, str] = {}
+
+    def load(self):
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("window_seconds") != self.window_seconds:
+            return
+        self.inode = data.get("inode")
+        self.indexed_size = data.get("indexed_size", 0)
+        self.windows = [[window_start, offset, agents, WindowStats.from_json(stats)]
+                        for window_start, offset, agents, stats in data.get("windows", [])]
+        self.player_names = data.get("player_names", {})
+
+    def save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "window_seconds": self.window_seconds,
+            "inode": self.inode,
+            "indexed_size": self.indexed_size,
+            "windows": [[window_start, offset, agents, stats.to_json()]
+                        for window_start, offset, agents, stats in self.windows],
+            "player_names": self.player_names,
+        }
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error writing index {self.index_path}: {e}", file=sys.stderr)
+
+    def validate(self):
+        """Drop the index if the log was rotated or truncated since it was built"""
+        stat = os.stat(self.log_path)
+        if self.inode != stat.st_ino or stat.st_size < self.indexed_size:
+            self.inode = stat.st_ino
+            self.indexed_size = 0
+            self.windows = []
+            self.player_names = {}
+
+    def update(self):
+        """
+        Index and aggregate the bytes appended since the last run.
+
+        This is the only pass that parses lines; the index is saved at the end.
+        """
+        if os.path.getsize(self.log_path) == self.indexed_size:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            window: Optional[WindowStats] = self.windows[-1][3] if self.windows else None
+            agents: List[str] = self.windows[-1][2] if self.windows else []
+            seen = {agent.encode() for agent in agents}
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partial line still being written
+                header = parse_header(raw)
+                if header:
+                    ts, component, event = header
+                    window_start = int(ts) - int(ts) % self.window_seconds
+                    if not self.windows or self.windows[-1][0] != window_start:
+                        window, agents, seen = WindowStats(), [], set()
+                        self.windows.append([window_start, offset, agents, window])
+                    keys = AGENT_PATTERN.findall(raw)
+                    for agent in keys:
+                        if agent not in seen:
+                            seen.add(agent)
+                            agents.append(agent.decode("utf-8", "replace"))
+                    if event in JOIN_EVENTS:
+                        fields = parse_fields(raw)
+                        self.player_names[fields.get("player_id", "")] = fields.get("name", "")
+                    window.add(raw, ts, component, event, keys)
+                elif window is not None:
+                    window.lines += 1
+                offset += len(raw)
+            self.indexed_size = offset
+        self.save()
+
+    def agent_keys(self, agent: str) -> Set[str]:
+        """The agent name plus every player id that joined under it"""
+        return {agent} | {pid for pid, name in self.player_names.items() if name == agent}
+
+    def select(self, since: Optional[float], until: Optional[float], agents: Optional[Set[str]]
+               ) -> Iterator[Tuple[int, int, int, WindowStats]]:
+        """
+        Windows that may contain matching lines, as (window_start, start, end, stats).
+
+        Windows outside [since, until] or without any of the requested agents
+        are skipped.
+        """
+        for i, (window_start, offset, window_agents, stats) in enumerate(self.windows):
+            end = self.windows[i + 1][1] if i + 1 < len(self.windows) else self.indexed_size
+            if since is not None and window_start + self.window_seconds <= since:
+                continue
+            if until is not None and window_start > until:
+                break
+            if agents is not None and agents.isdisjoint(window_agents):
+                continue
+            yield window_start, offset, end, stats
+
+
+def iter_lines(path: str, byte_ranges: List[Tuple[int, int]]) -> Iterator[bytes]:
+    """Yield raw lines from the given byte ranges of a file"""
+    with open(path, "rb") as f:
+        for start, end in byte_ranges:
+            f.seek(start)
+            position = start
+            while position < end:
+                raw = f.readline()
+                if not raw:
+                    break
+                position += len(raw)
+                yield raw
+
+
+class Analyzer:
+    """Incremental aggregation of parsed log events"""
+
+    def __init__(self, agent: Optional[str] = None, since: Optional[float] = None,
+                 until: Optional[float] = None, timeline_limit: int = 200):
+        self.agent = agent
+        self.since = since
+        self.until = until
+        self.timeline_limit = timeline_limit
+        self.agents: Dict[str, AgentStats] = {}
+        self.matches: List[MatchStats] = []
+        self.player_names: Dict[str, str] = {}
+        self.lines = 0
+        self.events = 0
+
+    def _agent_stats(self, agent: str) -> AgentStats:
+        stats = self.agents.get(agent)
+        if stats is None:
+            stats = self.agents[agent] = AgentStats()
+        return stats
+
+    def _match(self, ts: float) -> MatchStats:
+        if not self.matches or ts - self.matches[-1].end > MATCH_GAP_SECONDS:
+            self.matches.append(MatchStats(ts))
+        match = self.matches[-1]
+        match.end = max(match.end, ts)
+        return match
+
+    def _matches_agent(self, keys: List[bytes]) -> bool:
+        for value in keys:
+            agent = value.decode("utf-8", "replace")
+            if agent == self.agent or self.player_names.get(agent) == self.agent:
+                return True
+        return False
+
+    def feed(self, raw: bytes):
+        self.lines += 1
+        header = parse_header(raw)
+        if not header:
+            return
+        ts, component, event = header
+        if event in JOIN_EVENTS:
+            # Recorded before any filter: names must resolve for ids in every window
+            fields = parse_fields(raw)
+            self.player_names[fields.get("player_id", "")] = fields.get("name", "")
+        if self.since is not None and ts < self.since:
+            return
+        if self.until is not None and ts > self.until:
+            return
+        if self.agent is not None and not self._matches_agent(AGENT_PATTERN.findall(raw)):
+            return
+        self.events += 1
+
+        if component == b"server":
+            match = self._match(ts)
+            if event in AGGREGATED_EVENTS:
+                self._feed_game(ts, match, event.decode(), parse_fields(raw))
+        elif component == b"mcp_server" and event in AGGREGATED_EVENTS:
+            fields = parse_fields(raw)
+            self._agent_stats(fields.get("agent", "unknown")).add_event(ts, event.decode(), fields)
+
+    def merge_window(self, window: WindowStats):
+        """Add a cached window that lies entirely within --since/--until"""
+        self.lines += window.lines
+        game_events = []
+        span: Optional[List[float]] = None
+        for key, group in window.groups.items():
+            if self.agent is not None and not self._matches_agent(key.split(b" ") if key else []):
+                continue
+            self.events += group.events
+            for agent, stats in group.agents.items():
+                self._agent_stats(agent).merge(stats)
+            if group.server_span is not None:
+                if span is None:
+                    span = list(group.server_span)
+                else:
+                    span = [min(span[0], group.server_span[0]), max(span[1], group.server_span[1])]
+            game_events.extend(group.game_events)
+        if span is None:
+            return
+        # Same match bookkeeping as feeding the window's game server lines in order
+        self._match(span[0])
+        for _, ts, event, fields in sorted(game_events, key=lambda entry: entry[0]):
+            self._feed_game(ts, self._match(ts), event, fields)
+        self._match(span[1])
+
+    def _feed_game(self, ts: float, match: MatchStats, event: str, fields: Dict[str, str]):
+        if event == "player_eliminated":
+            by = fields.get("eliminated_by", "")
+            match.eliminations[by] = match.eliminations.get(by, 0) + 1
+            self._add_timeline(match, ts, "elimination", fields.get("player_id", ""), by=by)
+        elif event == "flag_captured":
+            player = fields.get("player_id", "")
+            try:
+                red_score = int(fields.get("red_score", "0"))
+                blue_score = int(fields.get("blue_score", "0"))
+            except ValueError:
+                red_score, blue_score = match.red_score, match.blue_score
+            if red_score + blue_score < match.red_score + match.blue_score:
+                # Scores went backwards: the game server was restarted
+                match.end = ts  # keep the closed match's end time accurate
+                self.matches.append(MatchStats(ts))
+                match = self.matches[-1]
+            match.red_score, match.blue_score = red_score, blue_score
+            match.captures[player] = match.captures.get(player, 0) + 1
+            self._add_timeline(match, ts, "capture", player)
+        elif event == "team_chat":
+            match.chat_messages += 1
+
+    def _add_timeline(self, match: MatchStats, ts: float, kind: str, player: str, **extra):
+        if len(match.timeline) < self.timeline_limit:
+            match.timeline.append(dict({"t": int(ts - match.start), "event": kind, "player": player}, **extra))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "lines": self.lines,
+            "events": self.events,
+            "agents": {agent: stats.summary() for agent, stats in sorted(self.agents.items())},
+            "matches": [match.summary(self.player_names) for match in self.matches],
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"Analyzed {report['events']} events ({report['lines']} lines)")
+
+    if report["agents"]:
+        print("\nPER AGENT")
+        for agent, stats in report["agents"].items():
+            print(f"  {agent}: blocked_moves={stats['blocked_moves']} "
+                  f"blocked_time={stats['blocked_move_ms'] / 1000:.1f}s "
+                  f"rate_limit_hits={stats['rate_limit_hits']} "
+                  f"peak_rate_limit_per_min={stats['rate_limit_peak_per_minute']} "
+                  f"reconnects={stats['reconnects']} downtime={stats['downtime_ms'] / 1000:.1f}s")
+            for tool, t in stats["tools"].items():
+                print(f"    {tool:<20} calls={t['calls']:<6} failures={t['failures']:<5} "
+                      f"p50={t['p50_ms']:.0f}ms p90={t['p90_ms']:.0f}ms p99={t['p99_ms']:.0f}ms")
+
+        wasted = max(report["agents"].items(), key=lambda kv: kv[1]["blocked_move_ms"])
+        if wasted[1]["blocked_move_ms"]:
+            print(f"\n  Most time lost to blocked moves: {wasted[0]} ({wasted[1]['blocked_move_ms'] / 1000:.1f}s)")
+
+    for i, match in enumerate(report["matches"], 1):
+        print(f"\nMATCH {i}: started {match['start']}, {match['duration_s']}s, "
+              f"Red {match['score']['red']} - Blue {match['score']['blue']}")
+        if match["eliminations"]:
+            print("  Eliminations: " + ", ".join(f"{p}={n}" for p, n in match["eliminations"].items()))
+        if match["captures"]:
+            print("  Captures: " + ", ".join(f"{p}={n}" for p, n in match["captures"].items()))
+        for entry in match["timeline"]:
+            by = f" by {entry['by']}" if "by" in entry else ""
+            print(f"    +{entry['t']:>4}s {entry['event']:<11} {entry['player']}{by}")
+
+
+def analyze(paths: List[str], analyzer: Analyzer, window_seconds: int, use_index: bool = True):
+    """Run a one-shot analysis over complete log files"""
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Skipping missing log file: {path}", file=sys.stderr)
+            continue
+        if not use_index:
+            for raw in iter_lines(path, [(0, os.path.getsize(path))]):
+                analyzer.feed(raw)
+            continue
+
+        index = LogIndex(path, window_seconds)
+        index.load()
+        index.validate()
+        index.update()
+        # Joins in windows the filters skip still name the ids in the selected ones
+        analyzer.player_names.update(index.player_names)
+        agents = index.agent_keys(analyzer.agent) if analyzer.agent is not None else None
+        for window_start, start, end, stats in index.select(analyzer.since, analyzer.until, agents):
+            inside = ((analyzer.since is None or window_start >= analyzer.since) and
+                      (analyzer.until is None or window_start + window_seconds - 1 <= analyzer.until))
+            if inside:
+                analyzer.merge_window(stats)
+            else:
+                for raw in iter_lines(path, [(start, end)]):
+                    analyzer.feed(raw)
+
+
+class FollowedFile:
+    """Tail a log file, reopening it when it is rotated or truncated"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.inode = None
+        self.buffer = b""
+
+    def _open(self):
+        try:
+            self.file = open(self.path, "rb")
+        except OSError:
+            self.file = None
+            return
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        self.buffer = b""
+
+    def read_lines(self) -> List[bytes]:
+        if self.file is None:
+            self._open()
+            if self.file is None:
+                return []
+
+        lines = []
+        while True:
+            chunk = self.file.read(1 << 16)
+            if not chunk:
+                break
+            self.buffer += chunk
+            *complete, self.buffer = self.buffer.split(b"\n")
+            lines.extend(raw + b"\n" for raw in complete)
+
+        # Detect rotation (new inode) or truncation (file shorter than position)
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return lines
+        if stat.st_ino != self.inode or stat.st_size < self.file.tell():
+            self.file.close()
+            self._open()
+            lines.extend(self.read_lines())
+        return lines
+
+
+def follow(paths: List[str], analyzer: Analyzer, report_interval: float, as_json: bool):
+    """Keep analyzing new lines as they are appended to the logs"""
+    files = [FollowedFile(path) for path in paths]
+    for f in files:
+        for raw in f.read_lines():
+            analyzer.feed(raw)
+    last_report = 0.0
+    try:
+        while True:
+            for f in files:
+                for raw in f.read_lines():
+                    analyzer.feed(raw)
+            now = time.time()
+            if now - last_report >= report_interval:
+                last_report = now
+                emit(analyzer.report(), as_json)
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        emit(analyzer.report(), as_json)
+
+
+def emit(report: Dict[str, Any], as_json: bool):
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    sys.stdout.flush()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Capture the Flag log analyzer")
+    parser.add_argument("logs", nargs="*",
+                        help="Log files to analyze (default: logs/mcp_server.log logs/game_server.log)")
+    parser.add_argument("--agent", help="Only include events for this agent name or player id")
+    parser.add_argument("--since", help="Only include events at or after this time (YYYY-MM-DD HH:MM:SS)")
+    parser.add_argument("--until", help="Only include events at or before this time (YYYY-MM-DD HH:MM:SS)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW_SECONDS,
+                        help=f"Index window size in seconds (default: {DEFAULT_WINDOW_SECONDS})")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Scan files fully without reading or writing the offset index")
+    parser.add_argument("--follow", action="store_true",
+                        help="Keep following the logs (across rotation) and report periodically")
+    parser.add_argument("--report-interval", type=float, default=10.0,
+                        help="Seconds between reports in --follow mode (default: 10)")
+    parser.add_argument("--timeline-limit", type=int, default=200,
+                        help="Maximum timeline entries kept per match (default: 200)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = args.logs or [
+        os.getenv("MCP_LOG_PATH", "logs/mcp_server.log"),
+        os.getenv("GAME_LOG_PATH", "logs/game_server.log"),
+    ]
+
+    analyzer = Analyzer(
+        agent=args.agent,
+        since=parse_time(args.since) if args.since else None,
+        until=parse_time(args.until) if args.until else None,
+        timeline_limit=args.timeline_limit,
+    )
+
+    if args.follow:
+        follow(paths, analyzer, args.report_interval, args.json)
+    else:
+        analyze(paths, analyzer, args.window, use_index=not args.no_index)
+        emit(analyzer.report(), args.json)
@@ -506,12 +506,22 @@ func (h *Hub) handleWebSocket(w http.ResponseWriter, r *http.Request) {
 	}
 	defer conn.Close()
 
-	h.register <- conn
+	// Connections opened with ?subscribe=0 only send joins and actions and do
+	// not receive game state broadcasts (used by the local frame relay, which
+	// holds a single subscribed connection for all agents on a host)
+	subscribe := r.URL.Query().Get("subscribe") != "0"
+	if subscribe {
+		h.register <- conn
+	}
 
 	for {
 		_, message, err := conn.ReadMessage()
 		if err != nil {
-			h.unregister <- conn
+			if subscribe {
+				h.unregister <- conn
+			} else {
+				h.cleanupPlayerData(conn)
+			}
 			break
 		}
 
@@ -529,6 +539,20 @@ func (h *Hub) handleWebSocket(w http.ResponseWriter, r *http.Request) {
 			
 			h.mutex.Lock()
 			
+			// A player reconnecting with its own id takes over its existing
+			// player (position, flag and score state are kept)
+			if existing, ok := h.gameState.Players[playerID]; ok && existing.Name == name {
+				for oldConn, id := range h.connToPlayer {
+					if id == playerID {
+						delete(h.connToPlayer, oldConn)
+					}
+				}
+				h.connToPlayer[conn] = playerID
+				h.mutex.Unlock()
+				gameLog("player_rejoined", fmt.Sprintf("player_id=%s team=%s name=%s", playerID, existing.Team, name))
+				continue
+			}
+			
 			// Check if name is already taken
 			if h.usedNames[name] {
 				h.mutex.Unlock()
@@ -714,6 +738,12 @@ func main() {
 	fs := http.FileServer(http.Dir("./static/"))
 	http.Handle("/", fs)
 
-	fmt.Println("Server starting on :8080")
-	log.Fatal(http.ListenAndServe(":8080", nil))
+	// Get port from environment variable, default to 8080
+	port := os.Getenv("PORT")
+	if port == "" {
+		port = "8080"
+	}
+
+	fmt.Printf("Server starting on :%s\n", port)
+	log.Fatal(http.ListenAndServe(":"+port, nil))
 }
\ No newline at end of file
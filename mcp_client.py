@@ -1,7 +1,18 @@
 import asyncio
+import argparse
+import contextlib
+import json
+import math
+import os
 import subprocess
+import time
+from typing import List, Literal
 import dotenv
+import requests
+from pydantic import BaseModel
 from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import FunctionModel, AgentInfo
 from pydantic_ai.usage import UsageLimits
 from pydantic_ai.mcp import MCPServerStdio
 
@@ -20,48 +31,244 @@ model = 'claude-sonnet-4-20250514'
 request_limit = 100
 
 
-def create_agent(player_config):
-    server = MCPServerStdio('uv', args=['run', 'mcp_server.py'])
+def create_agent(player_config, server_url="localhost:8080", model=model):
+    # Pass the environment through explicitly so MCP_LOG_PATH reaches the server
+    server = MCPServerStdio('uv', args=['run', 'mcp_server.py', '--server-url', server_url], env=dict(os.environ))
     agent = Agent(model, mcp_servers=[server])
     return agent, server, player_config
 
-# Create agents for all configured players
-agents_data = [create_agent(config) for config in PLAYERS_CONFIG]
-
-prompt_template = """You are an autonomous agent named '{name}' playing capture the flag. 
+prompt_template = """You are an autonomous agent named '{name}' playing capture the flag.
 You are strategic, competitive, and focused on winning for your team.
 Join the {team} team with the name '{name}' and coordinate with your teammates.
 
 Actions have delays - anticipate opponents' actions.
 """
 
-async def run_agent(agent, server, player_config):
+async def run_agent(agent, server, player_config, request_limit=request_limit):
     """Run a single agent"""
     name = player_config["name"]
     team = player_config["team"]
-    
+
     try:
         async with agent.run_mcp_servers():
             result = await agent.run(
-                prompt_template.format(name=name, team=team), 
+                prompt_template.format(name=name, team=team),
                 usage_limits=UsageLimits(request_limit=request_limit)
             )
             print(f"Agent {name} ({team}): {result.output}")
     except Exception as e:
         print(f"Error running agent {name}: {e}")
 
-async def main():
+async def main(server_url="localhost:8080", model=model, request_limit=request_limit):
+    # Create agents for all configured players
+    agents_data = [create_agent(config, server_url, model) for config in PLAYERS_CONFIG]
+
     print(f"Starting {len(PLAYERS_CONFIG)} agents...")
     for config in PLAYERS_CONFIG:
         print(f"  - {config['name']} on {config['team'].upper()} team")
-    
+
     # Run all agents concurrently
-    tasks = [run_agent(agent, server, config) for agent, server, config in agents_data]
+    tasks = [run_agent(agent, server, config, request_limit) for agent, server, config in agents_data]
     await asyncio.gather(*tasks, return_exceptions=True)
 
+# Team coordinator mode: one model call per team per decision step
+class PlayerAction(BaseModel):
+    player: str
+    action: Literal["move", "attack", "message", "wait"]
+    x: float = 0
+    y: float = 0
+    message: str = ""
+
+class TeamPlan(BaseModel):
+    actions: List[PlayerAction]
+
+coordinator_prompt = """You coordinate the {team} team in a capture the flag game on an 800x600 field.
+Your players: {players}.
+Each step, return exactly one action per player:
+- move: go to (x, y); moves are capped at 200 pixels per step
+- attack: eliminate an enemy within 50 pixels
+- message: send a short team chat message
+- wait: do nothing this step
+Pick up the enemy flag by moving onto it and score by bringing it to your base
+(red base x<100, blue base x>700, 250<y<350). The center wall (350-450, 250-350) blocks movement.
+"""
+
+def fetch_game_state(server_url):
+    response = requests.get(f"http://{server_url}/game-state", timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+def team_state_json(game_state, team):
+    """Shared state for a team decision, as one JSON line"""
+    players = []
+    for player in game_state.get("players", {}).values():
+        players.append({
+            "name": player.get("name"),
+            "team": player.get("team"),
+            "x": round(player.get("x", 0)),
+            "y": round(player.get("y", 0)),
+            "alive": player.get("isAlive", True),
+            "hasFlag": player.get("hasFlag", False),
+        })
+    flags = {}
+    for flag_team in ("red", "blue"):
+        flag = game_state.get(f"{flag_team}Flag", {})
+        flags[flag_team] = {"x": round(flag.get("x", 0)), "y": round(flag.get("y", 0)),
+                            "atBase": flag.get("isAtBase", True), "carried": bool(flag.get("carrier"))}
+    return json.dumps({
+        "team": team,
+        "score": {"red": game_state.get("redScore", 0), "blue": game_state.get("blueScore", 0)},
+        "players": players,
+        "flags": flags,
+        "chat": [m.get("message", "") for m in game_state.get(f"{team}TeamMessages", [])[-3:]],
+    }, separators=(",", ":"))
+
+def stub_team_policy(messages, info: AgentInfo) -> ModelResponse:
+    """
+    Offline stand-in for the coordinator model: a fixed heuristic over the
+    STATE line of the prompt, returned as a TeamPlan output tool call.
+    """
+    prompt = next(part.content for message in reversed(messages) for part in reversed(message.parts)
+                  if isinstance(part, UserPromptPart))
+    state = json.loads(prompt.rsplit("STATE: ", 1)[1])
+    team = state["team"]
+    enemy_team = "blue" if team == "red" else "red"
+    home = (50, 300) if team == "red" else (750, 300)
+    enemy_flag = state["flags"][enemy_team]
+    mine = [p for p in state["players"] if p["team"] == team]
+    enemies = [p for p in state["players"] if p["team"] == enemy_team and p["alive"]]
+
+    actions = []
+    for i, player in enumerate(mine):
+        name = player["name"]
+        nearest = min(enemies, key=lambda e: math.hypot(e["x"] - player["x"], e["y"] - player["y"]), default=None)
+        if not player["alive"]:
+            actions.append({"player": name, "action": "wait"})
+        elif player["hasFlag"]:
+            actions.append({"player": name, "action": "move", "x": home[0], "y": home[1]})
+        elif nearest and math.hypot(nearest["x"] - player["x"], nearest["y"] - player["y"]) < 50:
+            actions.append({"player": name, "action": "attack"})
+        elif i % 2 == 0 and not enemy_flag["carried"]:
+            actions.append({"player": name, "action": "move", "x": enemy_flag["x"], "y": enemy_flag["y"]})
+        elif nearest:
+            actions.append({"player": name, "action": "move", "x": nearest["x"], "y": nearest["y"]})
+        else:
+            actions.append({"player": name, "action": "wait"})
+    return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, {"actions": actions})])
+
+async def execute_action(server, action: PlayerAction):
+    """Carry out one player's action through its own MCP server"""
+    try:
+        if action.action == "move":
+            await server.call_tool("move_to_position", {"x": action.x, "y": action.y})
+        elif action.action == "attack":
+            await server.call_tool("attack", {})
+        elif action.action == "message" and action.message:
+            await server.call_tool("send_team_message", {"message": action.message[:200]})
+    except Exception as e:
+        print(f"Error executing {action.action} for {action.player}: {e}")
+
+async def run_team(team, configs, server_url, coordinator_model, steps):
+    """Run one team with a single coordinator call per decision step"""
+    names = [config["name"] for config in configs]
+    servers = {
+        config["name"]: MCPServerStdio('uv', args=['run', 'mcp_server.py', '--server-url', server_url], env=dict(os.environ))
+        for config in configs
+    }
+    coordinator = Agent(coordinator_model, output_type=TeamPlan,
+                        system_prompt=coordinator_prompt.format(team=team, players=", ".join(names)))
+
+    stats = {"team": team, "llm_calls": 0, "decision_times": [], "captures": 0, "failed_steps": 0}
+    async with contextlib.AsyncExitStack() as stack:
+        for server in servers.values():
+            await stack.enter_async_context(server)
+        joins = await asyncio.gather(*(servers[name].call_tool("join_game", {"player_name": name, "team": team})
+                                       for name in names))
+        # join_game reports rejections as text, not as a tool error
+        failed = [f"{name}: {result}" for name, result in zip(names, joins) if not str(result).startswith("✅")]
+        if failed:
+            raise RuntimeError(f"join_game failed for team {team}: " + "; ".join(failed))
+
+        last_decision = None
+        for _ in range(steps):
+            try:
+                game_state = await asyncio.to_thread(fetch_game_state, server_url)
+                if game_state.get("gameEnded"):
+                    break
+                now = time.time()
+                if last_decision is not None:
+                    stats["decision_times"].append(now - last_decision)
+                last_decision = now
+
+                result = await coordinator.run(f"STATE: {team_state_json(game_state, team)}",
+                                               usage_limits=UsageLimits(request_limit=3))
+                stats["llm_calls"] += result.usage().requests
+                actions = [a for a in result.output.actions if a.player in servers]
+                await asyncio.gather(*(execute_action(servers[a.player], a) for a in actions))
+            except Exception as e:
+                # One bad model reply or failed fetch costs a step, not the game
+                stats["failed_steps"] += 1
+                print(f"Error in team {team} step: {e}")
+
+        try:
+            final_state = await asyncio.to_thread(fetch_game_state, server_url)
+            stats["captures"] = final_state.get(f"{team}Score", 0)
+        except Exception as e:
+            print(f"Error fetching final state for team {team}: {e}")
+    return stats
+
+def print_team_stats(stats):
+    times = sorted(stats["decision_times"])
+    mean = sum(times) / len(times) if times else 0.0
+    p95 = times[min(len(times) - 1, int(0.95 * len(times)))] if times else 0.0
+    per_capture = f"{stats['llm_calls'] / stats['captures']:.1f}" if stats["captures"] else "n/a"
+    print(f"Team {stats['team']}: {stats['llm_calls']} LLM calls, {stats['captures']} captures, "
+          f"{per_capture} calls/capture, time between decisions mean {mean:.2f}s p95 {p95:.2f}s, "
+          f"{stats['failed_steps']} failed steps")
+
+async def team_main(server_url="localhost:8080", model=model, steps=request_limit, stub_model=False):
+    coordinator_model = FunctionModel(stub_team_policy) if stub_model else model
+    teams = {}
+    for config in PLAYERS_CONFIG:
+        teams.setdefault(config["team"], []).append(config)
+
+    print(f"Starting {len(teams)} team coordinators ({'stub model' if stub_model else model})...")
+    results = await asyncio.gather(
+        *(run_team(team, configs, server_url, coordinator_model, steps) for team, configs in teams.items()),
+        return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Error running team: {result}")
+        else:
+            print_team_stats(result)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Capture the Flag MCP Client")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="Game server port (default: 8080)")
+    parser.add_argument("--model", default=model,
+                        help=f"Model used by every agent (default: {model})")
+    parser.add_argument("--request-limit", type=int, default=request_limit,
+                        help=f"Maximum model requests per agent (default: {request_limit})")
+    parser.add_argument("--team-mode", action="store_true",
+                        help="One coordinator model call per team per step, executed through each player's MCP server")
+    parser.add_argument("--stub-model", action="store_true",
+                        help="Team mode only: use an offline heuristic instead of an LLM (for benchmarking)")
+    parser.add_argument("--no-game-server", action="store_true",
+                        help="Do not start a game server, connect to one already running on --port")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    subprocess.run("lsof -ti:8080 | xargs -r kill", shell=True)
-    server = subprocess.Popen(['go', 'run', 'main.go'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    asyncio.sleep(3)  # Wait for server to start
+    args = parse_args()
+
+    server = None
+    if not args.no_game_server:
+        subprocess.run(f"lsof -ti:{args.port} | xargs -r kill", shell=True)
+        server = subprocess.Popen(['go', 'run', 'main.go'], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                  env=dict(os.environ, PORT=str(args.port)))
+        time.sleep(3)  # Wait for server to start
 
-    asyncio.run(main())
\ No newline at end of file
+    if args.team_mode:
+        asyncio.run(team_main(f"localhost:{args.port}", args.model, args.request_limit, args.stub_model))
+    else:
+        asyncio.run(main(f"localhost:{args.port}", args.model, args.request_limit))
@@ -0,0 +1,246 @@
+"""
+Opt-in profiling for the MCP server tools.
+
+Three independent mechanisms, all off unless enabled from the command line:
+
+- sampled: a background thread snapshots the main thread's stack every few
+  milliseconds and attributes each sample to the tool whose coroutine is on
+  the stack (or to "(background)", e.g. the WebSocket listener, also while no
+  tool is running; only the idle select() is skipped). Overhead is low enough
+  to leave on during real matches.
+- deterministic: cProfile around a fraction of tool calls, one profile per
+  tool. Only one cProfile can be active at a time, so calls overlapping a
+  profiled call run unprofiled (counted in the summary). The profile stays
+  enabled while the tool awaits, so event loop work that runs meanwhile
+  (the WebSocket listener, other tools' callbacks) is charged to it too:
+  read the tool's own functions by tottime, not the totals.
+- allocations: tracemalloc snapshots every window, keeping the top growth
+  sites of each window.
+
+Every tool call is also timed (calls, mean, max). Results are written to a
+timestamped directory at shutdown (including SIGTERM, as sent by
+tournament.py) and whenever the process receives SIGUSR1.
+"""
+
+import atexit
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import random
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+BACKGROUND = "(background)"
+# Stack frames kept per sample (innermost first) in collapsed stacks
+MAX_STACK_DEPTH = 64
+# Allocation windows kept in memory
+MAX_ALLOCATION_WINDOWS = 120
+
+
+class ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.profiled_calls = 0
+        self.skipped_concurrent = 0
+
+
+class ToolProfiler:
+    def __init__(self, mode: str, output_dir: str, sample_interval: float = 0.005,
+                 sample_rate: float = 1.0, top_n: int = 20, allocation_window: float = 0.0,
+                 log: Optional[Callable[[str, str], None]] = None):
+        self.mode = mode  # "off", "sampled" or "deterministic"
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self.allocation_window = allocation_window
+        self.log = log or (lambda event, details: None)
+
+        self.tool_stats: Dict[str, ToolStats] = {}
+        self.tool_codes: Dict[object, str] = {}  # code object -> tool name
+        self.lock = threading.Lock()
+
+        # sampled mode: tool -> collapsed stack -> count
+        self.samples: Dict[str, Dict[str, int]] = {}
+        self.main_thread_id = threading.main_thread().ident
+
+        # deterministic mode
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.active_profile: Optional[str] = None  # tool whose profile is enabled
+
+        # allocation tracking
+        self.allocation_windows = deque(maxlen=MAX_ALLOCATION_WINDOWS)
+
+        self.started_at = time.time()
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if self.mode == "sampled":
+            threading.Thread(target=self._sample_loop, name="tool-profiler", daemon=True).start()
+        if self.allocation_window > 0:
+            tracemalloc.start(10)
+            threading.Thread(target=self._allocation_loop, name="alloc-tracker", daemon=True).start()
+        atexit.register(self.dump)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.dump())
+        previous = signal.getsignal(signal.SIGTERM)
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._terminate(signum, frame, previous))
+
+    def _terminate(self, signum, frame, previous):
+        """Dump on SIGTERM (atexit does not run when killed), then exit as before"""
+        atexit.unregister(self.dump)
+        self.dump()
+        if callable(previous):
+            previous(signum, frame)
+        else:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    async def run(self, name: str, func, *args, **kwargs):
+        """Call a tool (sync wrapper returning a coroutine, or async) under profiling"""
+        code = getattr(inspect.unwrap(func), "__code__", None)
+        if code is not None and code not in self.tool_codes:
+            self.tool_codes[code] = name
+        stats = self.tool_stats.get(name)
+        if stats is None:
+            stats = self.tool_stats[name] = ToolStats()
+
+        profile = None
+        if self.mode == "deterministic" and random.random() < self.sample_rate:
+            if self.active_profile is not None:
+                stats.skipped_concurrent += 1
+            else:
+                profile = self.profiles.get(name)
+                if profile is None:
+                    profile = self.profiles[name] = cProfile.Profile()
+                self.active_profile = name
+                stats.profiled_calls += 1
+                profile.enable()
+
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                self.active_profile = None
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+
+    def _sample_loop(self):
+        while not self.stop_event.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is None:
+                continue
+            tool = None
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if tool is None:
+                    tool = self.tool_codes.get(code)
+                if len(stack) < MAX_STACK_DEPTH:
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if tool is None:
+                # Event loop idle in select() is not interesting
+                if stack[0].endswith(":select"):
+                    continue
+                tool = BACKGROUND
+            collapsed = ";".join(reversed(stack))
+            with self.lock:
+                tool_samples = self.samples.setdefault(tool, {})
+                tool_samples[collapsed] = tool_samples.get(collapsed, 0) + 1
+
+    def _allocation_loop(self):
+        previous = tracemalloc.take_snapshot()
+        while not self.stop_event.wait(self.allocation_window):
+            snapshot = tracemalloc.take_snapshot()
+            top = snapshot.compare_to(previous, "lineno")[:self.top_n]
+            current, peak = tracemalloc.get_traced_memory()
+            with self.lock:
+                self.allocation_windows.append((time.time(), current, peak, [str(stat) for stat in top]))
+            previous = snapshot
+
+    def dump(self) -> Optional[str]:
+        """Write profiles and summaries; returns the output directory"""
+        if not self.tool_stats and not self.samples and not self.allocation_windows:
+            return None
+        directory = os.path.join(self.output_dir, f"profile_{os.getpid()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with self.lock:
+                summary = self._write_profiles(directory)
+                summary += self._write_allocations(directory)
+            with open(os.path.join(directory, "summary.txt"), "w") as f:
+                f.write(summary)
+        except OSError as e:
+            self.log("profile_dump_failed", f"dir={directory} details={str(e)}")
+            return None
+        self.log("profile_dumped", f"dir={directory} mode={self.mode} tools={len(self.tool_stats)}")
+        return directory
+
+    def _write_profiles(self, directory: str) -> str:
+        out = io.StringIO()
+        out.write(f"mode={self.mode} uptime_s={time.time() - self.started_at:.0f}\n\n")
+        out.write("TOOL TIMINGS\n")
+        for name, stats in sorted(self.tool_stats.items(), key=lambda kv: -kv[1].total_seconds):
+            mean_ms = stats.total_seconds / stats.calls * 1000 if stats.calls else 0.0
+            out.write(f"  {name:<24} calls={stats.calls:<6} total={stats.total_seconds:.2f}s "
+                      f"mean={mean_ms:.1f}ms max={stats.max_seconds * 1000:.1f}ms "
+                      f"profiled={stats.profiled_calls} skipped_concurrent={stats.skipped_concurrent}\n")
+
+        for name, profile in self.profiles.items():
+            if name == self.active_profile:
+                # Collecting stats disables the profiler mid-call; leave it for the next dump
+                out.write(f"\nPROFILE {name}: call in progress, skipped in this dump\n")
+                continue
+            profile.dump_stats(os.path.join(directory, f"{name}.prof"))
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(self.top_n)
+            out.write(f"\nTOP {self.top_n} BY CUMULATIVE TIME: {name}\n{stream.getvalue()}")
+
+        for name, stacks in self.samples.items():
+            safe_name = name.strip("()")
+            with open(os.path.join(directory, f"{safe_name}.collapsed"), "w") as f:
+                for stack, count in stacks.items():
+                    f.write(f"{stack} {count}\n")
+            # Self samples per frame (innermost frame of each stack)
+            self_counts: Dict[str, int] = {}
+            total = 0
+            for stack, count in stacks.items():
+                leaf = stack.rsplit(";", 1)[-1]
+                self_counts[leaf] = self_counts.get(leaf, 0) + count
+                total += count
+            out.write(f"\nTOP {self.top_n} SAMPLED FRAMES: {name} ({total} samples)\n")
+            for leaf, count in sorted(self_counts.items(), key=lambda kv: -kv[1])[:self.top_n]:
+                out.write(f"  {count / total * 100:5.1f}%  {leaf}\n")
+        return out.getvalue()
+
+    def _write_allocations(self, directory: str) -> str:
+        if not self.allocation_windows:
+            return ""
+        with open(os.path.join(directory, "allocations.txt"), "w") as f:
+            for ts, current, peak, top in self.allocation_windows:
+                f.write(f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')} "
+                        f"current={current / 1024:.0f}KiB peak={peak / 1024:.0f}KiB\n")
+                for line in top:
+                    f.write(f"  {line}\n")
+        ts, current, peak, top = self.allocation_windows[-1]
+        return (f"\nALLOCATIONS (last {self.allocation_window:.0f}s window): "
+                f"current={current / 1024:.0f}KiB peak={peak / 1024:.0f}KiB\n" +
+                "".join(f"  {line}\n" for line in top))
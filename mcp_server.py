@@ -7,12 +7,17 @@ import websockets
 import uuid
 import time
 import functools
+import math
+import random
 import argparse
 import sys
 import os
 from datetime import datetime
 from typing import Dict, Any, Optional, Union
 from fastmcp import FastMCP
+from mcp_profiler import ToolProfiler
+from prediction import (predict_position, solve_intercept, carrier_destination, distance_to_segment,
+                        ATTACK_RANGE, HOME_BASES, MOVE_SPEED)
 
 def mcp_log(event: str, details: str):
     """Log MCP server events to file"""
@@ -62,6 +67,32 @@ class RateLimiter:
         oldest_call = min(self.calls)
         return max(0.0, self.period - (now - oldest_call))
 
+# Frame relay configuration (will be updated from command line args)
+class RelayConfig:
+    socket_path: Optional[str] = None  # Unix socket of a local frame_relay.py, None to connect directly
+    max_frame_age = 1.0  # Seconds a streamed game state frame is served before tools fall back to HTTP
+
+# Game state encoding configuration (will be updated from command line args)
+class StateFormatConfig:
+    format = "full"  # "full" (absolute coordinates) or "compact" (relative to me, budgeted)
+    budget = 600  # Maximum characters of compact state, 0 for no limit
+
+# Enemy prediction configuration (will be updated from command line args)
+class PredictionConfig:
+    horizon = 1.5  # Seconds to project enemies forward (typical decision latency)
+    auto_aim = False  # Redirect move_to_position targets near a moving enemy to its intercept point
+    aim_lag_ticks = 6  # Ticks of movement behind an enemy that auto-aim still treats as aiming at it
+
+# Connection supervision configuration (will be updated from command line args)
+class ReconnectConfig:
+    enabled = True  # Reconnect and rejoin automatically when the WebSocket drops
+    ping_interval = 5.0  # Seconds between keepalive pings
+    ping_timeout = 5.0  # Seconds without a pong before the connection is considered dead
+    initial_delay = 0.1  # First reconnect backoff in seconds
+    max_delay = 5.0  # Maximum reconnect backoff in seconds
+    max_downtime = 120.0  # Seconds of failed reconnects before giving up (0 retries forever)
+    send_timeout = 10.0  # Seconds an action waits for a reconnect before failing
+
 # Global rate limiter
 rate_limiter = RateLimiter(RateLimitConfig.calls, RateLimitConfig.period)
 
@@ -82,6 +113,122 @@ def rate_limit(func):
         return result
     return wrapper
 
+# Compass labels for bearings (screen coordinates: y grows downward, so north is -y)
+_COMPASS = ["E", "SE", "S", "SW", "W", "NW", "N", "NE"]
+
+def _relative_position(x: float, y: float, origin_x: float, origin_y: float) -> str:
+    """Describe (x, y) relative to an origin as distance, bearing and offset"""
+    dx, dy = x - origin_x, y - origin_y
+    distance = math.hypot(dx, dy)
+    if distance < 1:
+        return "here"
+    bearing = _COMPASS[int(((math.degrees(math.atan2(dy, dx)) + 360 + 22.5) % 360) // 45)]
+    return f"d{distance:.0f} {bearing} ({dx:+.0f},{dy:+.0f})"
+
+# Tool profiler, created from command line args when profiling is enabled
+profiler: Optional[ToolProfiler] = None
+
+def profile_tool(func):
+    """Decorator to time and profile MCP tools when profiling is enabled"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if profiler is None:
+            result = func(*args, **kwargs)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        return await profiler.run(func.__name__, func, *args, **kwargs)
+    return wrapper
+
+def _format_compact_game_state(game_state: Dict[str, Any]) -> str:
+    """
+    Format the game state relative to my player, trimmed to the character budget.
+    
+    Score, my status and flags are always included. Other players follow,
+    sorted by relevance (flag carriers first, then the closest to me, to
+    either flag or to a flag carrier), then team chat and the field layout while budget remains.
+    
+    Returns:
+        str: Compact game state summary
+    """
+    players = game_state.get("players", {})
+    my_team = game_connection.player_team
+    me = players.get(game_connection.player_id) if game_connection.player_id else None
+    
+    required = [f"SCORE R{game_state.get('redScore', 0)} B{game_state.get('blueScore', 0)}"]
+    if not me:
+        required.append("ME not in game" if game_connection.player_id else "ME not connected")
+        # Without a player there is no origin; fall back to the field origin
+        mx, my = 0.0, 0.0
+    else:
+        mx, my = me.get("x", 0), me.get("y", 0)
+        status = ""
+        if me.get("hasFlag", False):
+            status += " carrying"
+        if not me.get("isAlive", True):
+            status += " dead"
+        required.append(f"ME {my_team} @({mx:.0f},{my:.0f}){status}")
+    
+    flags = {"red": game_state.get("redFlag", {}), "blue": game_state.get("blueFlag", {})}
+    for team, flag in flags.items():
+        label = "OUR FLAG" if team == my_team else "ENEMY FLAG"
+        carrier_id = flag.get("carrier", "")
+        if carrier_id == game_connection.player_id and carrier_id:
+            required.append(f"{label} carried by me")
+        elif carrier_id:
+            carrier = players.get(carrier_id, {})
+            side = "mate" if carrier.get("team") == my_team else "enemy"
+            required.append(f"{label} carried by {side} {carrier.get('name', 'unknown')}")
+        else:
+            where = "base" if flag.get("isAtBase", True) else "dropped"
+            required.append(f"{label} {where} {_relative_position(flag.get('x', 0), flag.get('y', 0), mx, my)}")
+    
+    # Rank other players by relevance to me, to both flags and to flag carriers
+    carriers = {flag.get("carrier", "") for flag in flags.values()} - {""}
+    anchors = [(flag.get("x", 0), flag.get("y", 0)) for flag in flags.values()]
+    ranked = []
+    for pid, player in players.items():
+        if pid == game_connection.player_id or not player.get("isAlive", True):
+            continue
+        px, py = player.get("x", 0), player.get("y", 0)
+        relevance = min(
+            math.hypot(px - mx, py - my),
+            *(math.hypot(px - ax, py - ay) for ax, ay in anchors),
+            *(math.hypot(px - players[cid].get("x", 0), py - players[cid].get("y", 0))
+              for cid in carriers if cid != pid and cid in players),
+        )
+        carrying = player.get("hasFlag", False)
+        kind = "E" if player.get("team") != my_team else "T"
+        line = f"{kind} {player.get('name', 'unknown')} {_relative_position(px, py, mx, my)}"
+        if carrying:
+            line += " carrying"
+        if player.get("isMoving", False):
+            line += f" ->({player.get('targetX', px) - mx:+.0f},{player.get('targetY', py) - my:+.0f})"
+        ranked.append((not carrying, relevance, line))
+    ranked.sort(key=lambda entry: entry[:2])
+    optional = [line for _, _, line in ranked]
+    
+    if my_team:
+        now = game_state.get("gameTime", 0)
+        for msg in game_state.get(f"{my_team}TeamMessages", [])[-3:][::-1]:
+            seconds_ago = max(0, (now - msg.get("timestamp", now)) // 1000)
+            optional.append(f"CHAT {msg.get('sender', 'unknown')}: {msg.get('message', '')[:60]} ({seconds_ago}s)")
+    
+    optional.append("FIELD bases R(50,300) B(750,300) wall x350-450 y250-350")
+    
+    lines = list(required)
+    size = sum(len(line) + 1 for line in lines)
+    for i, line in enumerate(optional):
+        # Leave room for the omitted trailer unless this is the last optional line
+        remaining = len(optional) - i - 1
+        reserve = len(f"+{remaining} more omitted") + 1 if remaining else 0
+        if StateFormatConfig.budget and size + len(line) + 1 + reserve > StateFormatConfig.budget:
+            lines.append(f"+{len(optional) - i} more omitted")
+            break
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
 def _format_game_state() -> str:
     """
     Helper function to format the current game state.
@@ -92,6 +239,9 @@ def _format_game_state() -> str:
     try:
         game_state = game_connection.get_game_state_sync()
         
+        if StateFormatConfig.format == "compact":
+            return _format_compact_game_state(game_state)
+        
         # Build concise status message
         lines = []
         
@@ -207,21 +357,118 @@ def _format_game_state() -> str:
     except Exception as e:
         return f"Error getting game state: {str(e)}"
 
+def _find_enemy(game_state: Dict[str, Any], player_name: str) -> Optional[Dict[str, Any]]:
+    """Find a living enemy player by name"""
+    for player in game_state.get("players", {}).values():
+        if (player.get("name") == player_name and player.get("team") != game_connection.player_team
+                and player.get("isAlive", True)):
+            return player
+    return None
+
+def _auto_aim(x: float, y: float, game_state: Dict[str, Any]):
+    """
+    Redirect a move target that is close to a moving enemy's path to its intercept point.
+    
+    The target is matched against each moving enemy's path from a few ticks
+    behind its position (the snapshot the agent aimed at is slightly older)
+    to where it will be at the prediction horizon. Targets at least as close
+    to a flag or base as to that path are left alone: the move is meant for
+    the objective, not the enemy.
+    
+    Returns:
+        (x, y, enemy_name, eta_seconds) or None if no moving enemy path is near the target
+    """
+    me = game_state.get("players", {}).get(game_connection.player_id)
+    if not me:
+        return None
+    objectives = list(HOME_BASES.values()) + [
+        (flag.get("x", 0), flag.get("y", 0))
+        for flag in (game_state.get("redFlag"), game_state.get("blueFlag")) if flag]
+    objective_distance = min(math.hypot(x - ox, y - oy) for ox, oy in objectives)
+    lag = MOVE_SPEED * PredictionConfig.aim_lag_ticks
+    best = None
+    for player in game_state.get("players", {}).values():
+        if player.get("team") == game_connection.player_team or not player.get("isAlive", True):
+            continue
+        if not player.get("isMoving", False):
+            continue
+        px, py = player.get("x", 0), player.get("y", 0)
+        dx, dy = player.get("targetX", px) - px, player.get("targetY", py) - py
+        heading = math.hypot(dx, dy) or 1.0
+        back_x, back_y = px - dx / heading * lag, py - dy / heading * lag
+        ahead_x, ahead_y, _ = predict_position(player, PredictionConfig.horizon, carrier_destination(player))
+        distance = min(distance_to_segment(x, y, back_x, back_y, px, py),
+                       distance_to_segment(x, y, px, py, ahead_x, ahead_y))
+        if distance > ATTACK_RANGE or distance >= objective_distance:
+            continue
+        if best is None or distance < best[0]:
+            best = (distance, player)
+    if best is None:
+        return None
+    intercept = solve_intercept(me.get("x", 0), me.get("y", 0), best[1])
+    if intercept is None:
+        return None
+    ix, iy, eta = intercept
+    return ix, iy, best[1].get("name", "unknown"), eta
+
 # MCP Server for Capture the Flag Game
 mcp = FastMCP(name="capture_flag_game")
 
+# Connection to a local frame relay, used in place of a WebSocket
+class RelayConnection:
+    """
+    Minimal WebSocket-like client for frame_relay.py.
+    
+    Messages are newline-delimited JSON over a Unix socket; the relay forwards
+    them to and from the game server.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+    
+    @classmethod
+    async def connect(cls, socket_path: str) -> "RelayConnection":
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=16 * 1024 * 1024)
+        return cls(reader, writer)
+    
+    async def send(self, message: str):
+        self.writer.write(message.encode() + b"\n")
+        await self.writer.drain()
+    
+    async def close(self):
+        self.writer.close()
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> str:
+        line = await self.reader.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line.decode()
+
 # Game connection state
 class GameConnection:
     def __init__(self):
-        self.websocket: Optional[websockets.WebSocketServerProtocol] = None
+        self.websocket: Optional[Union[websockets.WebSocketClientProtocol, RelayConnection]] = None
         self.player_id: Optional[str] = None
         self.player_name: Optional[str] = None
         self.player_team: Optional[str] = None
         self.game_state: Dict[str, Any] = {}
-        self.server_url = "localhost:8080"
+        self.game_state_at: Optional[float] = None  # When the current connection last streamed a frame
+        self.set_server_url(os.getenv("GAME_SERVER_URL", "localhost:8080"))
+        self.last_error: Optional[str] = None
+        self.closing = False  # Set when the connection is closed on purpose (no reconnect)
+        self.connected = asyncio.Event()
+        self.session = 0  # Incremented by every join; a supervisor only acts for its own session
+        self.reconnects = 0
+        self.total_downtime_ms = 0
+    
+    def set_server_url(self, server_url: str):
+        """Point the connection at a game server (host:port)"""
+        self.server_url = server_url
         self.ws_url = f"ws://{self.server_url}/ws"
         self.http_url = f"http://{self.server_url}/game-state"
-        self.last_error: Optional[str] = None
         
     async def connect(self, player_name: str, team: str) -> str:
         """Connect to the game server via WebSocket"""
@@ -230,21 +477,14 @@ class GameConnection:
             self.player_name = player_name
             self.player_team = team
             self.last_error = None
-            self.websocket = await websockets.connect(self.ws_url)
+            self.closing = False
+            self.session += 1
+            self.websocket = await self._open()
+            await self._send_join()
+            self.connected.set()
             
-            # Send join message
-            join_message = {
-                "type": "join",
-                "data": {
-                    "id": self.player_id,
-                    "name": player_name,
-                    "team": team
-                }
-            }
-            await self.websocket.send(json.dumps(join_message))
-            
-            # Start listening for game state updates
-            asyncio.create_task(self._listen_for_updates())
+            # Start listening for game state updates (reconnecting if the socket drops)
+            asyncio.create_task(self._supervise(self.session))
             
             # Wait briefly to check for error messages
             await asyncio.sleep(0.1)
@@ -257,6 +497,8 @@ class GameConnection:
                 self.player_name = None
                 self.player_team = None
                 self.last_error = None
+                self.closing = True
+                self.connected.clear()
                 if self.websocket:
                     await self.websocket.close()
                     self.websocket = None
@@ -270,6 +512,94 @@ class GameConnection:
                 mcp_log("tool_executed", f"tool=websocket_connect agent={self.player_name} execution_time_ms=0 success=false details={str(e)}")
             raise Exception(f"Failed to connect to game server: {str(e)}")
     
+    async def _open(self):
+        """Open a WebSocket (with keepalive pings) or a relay connection"""
+        # Frames from a previous connection must not be served as current state
+        self.game_state_at = None
+        if RelayConfig.socket_path:
+            return await RelayConnection.connect(RelayConfig.socket_path)
+        return await websockets.connect(
+            self.ws_url,
+            ping_interval=ReconnectConfig.ping_interval,
+            ping_timeout=ReconnectConfig.ping_timeout,
+        )
+    
+    async def _send_join(self):
+        """Send the join message for the current player identity"""
+        join_message = {
+            "type": "join",
+            "data": {
+                "id": self.player_id,
+                "name": self.player_name,
+                "team": self.player_team
+            }
+        }
+        await self.websocket.send(json.dumps(join_message))
+    
+    def _owns(self, session: int) -> bool:
+        """Whether a supervisor started for `session` may still act on the connection"""
+        return not self.closing and self.session == session
+    
+    async def _supervise(self, session: int):
+        """
+        Listen for updates and reconnect with jittered backoff when the socket drops.
+        
+        Rejoining with the same player id takes over the existing player on the
+        game server (keeping position and flag), and the server pushes the full
+        game state as soon as the new connection registers. After
+        ReconnectConfig.max_downtime seconds without success the player is
+        dropped so tools report that they are not connected.
+        
+        The supervisor exits as soon as the agent disconnects or joins again
+        (a new session), so it never touches a later identity's connection.
+        """
+        while True:
+            await self._listen_for_updates()
+            if not self._owns(session) or not ReconnectConfig.enabled or not self.player_id:
+                if self.session == session:
+                    self.connected.clear()
+                return
+            
+            self.connected.clear()
+            dropped_at = time.time()
+            mcp_log("websocket_disconnected", f"agent={self.player_name}")
+            attempts = 0
+            delay = ReconnectConfig.initial_delay
+            while self._owns(session):
+                attempts += 1
+                try:
+                    websocket = await self._open()
+                    if not self._owns(session):
+                        await websocket.close()
+                        return
+                    self.websocket = websocket
+                    await self._send_join()
+                    break
+                except Exception as e:
+                    if not self._owns(session):
+                        return
+                    mcp_log("websocket_reconnect_failed", f"agent={self.player_name} attempt={attempts} details={str(e)}")
+                    downtime = time.time() - dropped_at
+                    if ReconnectConfig.max_downtime and downtime >= ReconnectConfig.max_downtime:
+                        mcp_log("websocket_reconnect_gave_up", f"agent={self.player_name} attempts={attempts} downtime_ms={int(downtime * 1000)}")
+                        # Tools report "not connected" and join_game can start over
+                        self.websocket = None
+                        self.player_id = None
+                        self.player_name = None
+                        self.player_team = None
+                        self.game_state = {}
+                        return
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                    delay = min(delay * 2, ReconnectConfig.max_delay)
+            if not self._owns(session):
+                return
+            
+            downtime_ms = int((time.time() - dropped_at) * 1000)
+            self.reconnects += 1
+            self.total_downtime_ms += downtime_ms
+            self.connected.set()
+            mcp_log("websocket_reconnected", f"agent={self.player_name} attempts={attempts} downtime_ms={downtime_ms} total_downtime_ms={self.total_downtime_ms}")
+    
     async def _listen_for_updates(self):
         """Listen for game state updates from the server"""
         try:
@@ -285,6 +615,7 @@ class GameConnection:
                     
                     # Otherwise, treat as game state update
                     self.game_state = data
+                    self.game_state_at = time.monotonic()
         except Exception as e:
             # Log WebSocket error
             if hasattr(self, 'player_name') and self.player_name:
@@ -302,10 +633,35 @@ class GameConnection:
                 "action": action
             }
         }
-        await self.websocket.send(json.dumps(action_message))
+        for attempt in range(2):
+            # Wait out a reconnect in progress instead of failing the action
+            if not self.connected.is_set():
+                try:
+                    await asyncio.wait_for(self.connected.wait(), timeout=ReconnectConfig.send_timeout)
+                except asyncio.TimeoutError:
+                    raise Exception("Not connected to game server (reconnecting)")
+            websocket = self.websocket
+            try:
+                await websocket.send(json.dumps(action_message))
+                return
+            except Exception:
+                if attempt == 1 or not ReconnectConfig.enabled:
+                    raise
+                # The socket died under us; let the supervisor reconnect and retry once
+                if self.websocket is websocket:
+                    self.connected.clear()
     
     def get_game_state_sync(self) -> Dict[str, Any]:
-        """Get current game state via HTTP request"""
+        """
+        Get the current game state.
+        
+        The server (or the frame relay) streams every state change on the
+        connection, so the latest streamed frame is served while it is recent.
+        HTTP is only used before the first frame arrives or if the stream stalls.
+        """
+        if (self.connected.is_set() and self.game_state_at is not None and
+                time.monotonic() - self.game_state_at < RelayConfig.max_frame_age):
+            return self.game_state
         try:
             response = requests.get(self.http_url, timeout=5)
             response.raise_for_status()
@@ -322,6 +678,7 @@ _active_sessions = {}  # session_id -> connection_info
 
 
 @mcp.tool
+@profile_tool
 @rate_limit
 async def join_game(player_name: str, team: str) -> str:
     """
@@ -416,42 +773,8 @@ async def join_game(player_name: str, team: str) -> str:
         mcp_log("tool_executed", f"tool=join_game agent={player_name} execution_time_ms={execution_time_ms} success=false details={str(e)}")
         return f"❌ Error joining game: {str(e)}"
 
-@mcp.tool
-@rate_limit
-async def move_to_position(x: float, y: float) -> str:
-    """
-    Move your player to a specific target position on the game field.
-    
-    This is a blocking action that waits until your player reaches the target position.
-    Movement is continuous at 5 pixels per frame (about 80 pixels per second).
-    
-    Args:
-        x (float): X coordinate to move to (0-800, left edge to right edge)
-        y (float): Y coordinate to move to (0-600, top edge to bottom edge)
-    
-    Returns:
-        str: Success message when target is reached, or error description
-    
-    Movement mechanics:
-    - Continuous movement at 5 pixels per frame toward target
-    - Action blocks until player reaches target position
-    - Movement can be interrupted by death (respawning stops movement)
-    - Maximum distance limited to 200 pixels per move for safety
-    
-    Automatic interactions when moving close (within ~10 pixels):
-    - Enemy flag: Pick up automatically if not already carrying a flag
-    - Your base with enemy flag: Score a point and reset enemy flag to their base
-    - Your dropped flag: Return it to your base automatically
-    
-    Strategy:
-    - Move directly to target positions (flags, bases, strategic points)
-    - Movement is visible to other players in real-time
-    - Plan routes around obstacles (use get_game_state() to see field layout)
-    - Use obstacles for cover or to block enemy movement paths
-    
-    Example:
-        move_to_position(700, 300)  # Move to blue flag spawn
-    """
+async def _move_to_position(x: float, y: float) -> str:
+    """Move to (x, y) and wait for the outcome (see move_to_position)"""
     start_time = time.time()
     agent_name = getattr(game_connection, 'player_name', 'unknown')
     
@@ -522,7 +845,7 @@ async def move_to_position(x: float, y: float) -> str:
         
         # Wait for player to reach target or timeout
         timeout_seconds = max(10, distance / 80)  # Estimate time based on movement speed
-        start_time = asyncio.get_event_loop().time()
+        move_start_time = asyncio.get_event_loop().time()
         
         while True:
             await asyncio.sleep(0.1)  # Check every 100ms
@@ -583,7 +906,7 @@ async def move_to_position(x: float, y: float) -> str:
                 return f"{action_result}\n\n📊 CURRENT GAME STATE:\n{game_state_info}"
             
             # Check for timeout
-            if asyncio.get_event_loop().time() - start_time > timeout_seconds:
+            if asyncio.get_event_loop().time() - move_start_time > timeout_seconds:
                 execution_time_ms = int((time.time() - start_time) * 1000)
                 mcp_log("tool_executed", f"tool=move_to_position agent={agent_name} execution_time_ms={execution_time_ms} success=false details=timeout_at_x={player_x:.1f},y={player_y:.1f}")
                 
@@ -597,6 +920,60 @@ async def move_to_position(x: float, y: float) -> str:
         return f"Error moving: {str(e)}"
 
 @mcp.tool
+@profile_tool
+@rate_limit
+async def move_to_position(x: float, y: float) -> str:
+    """
+    Move your player to a specific target position on the game field.
+    
+    This is a blocking action that waits until your player reaches the target position.
+    Movement is continuous at 5 pixels per frame (about 300 pixels per second).
+    
+    Args:
+        x (float): X coordinate to move to (0-800, left edge to right edge)
+        y (float): Y coordinate to move to (0-600, top edge to bottom edge)
+    
+    Returns:
+        str: Success message when target is reached, or error description
+    
+    Movement mechanics:
+    - Continuous movement at 5 pixels per frame toward target
+    - Action blocks until player reaches target position
+    - Movement can be interrupted by death (respawning stops movement)
+    - Maximum distance limited to 200 pixels per move for safety
+    
+    Automatic interactions when moving close (within ~10 pixels):
+    - Enemy flag: Pick up automatically if not already carrying a flag
+    - Your base with enemy flag: Score a point and reset enemy flag to their base
+    - Your dropped flag: Return it to your base automatically
+    
+    Strategy:
+    - Move directly to target positions (flags, bases, strategic points)
+    - Movement is visible to other players in real-time
+    - Plan routes around obstacles (use get_game_state() to see field layout)
+    - Use obstacles for cover or to block enemy movement paths
+    
+    Auto-aim (when the server runs with --auto-aim):
+    - Targets within 50 pixels of a moving enemy's predicted path (and closer
+      to it than to any flag or base) are redirected to the point where you
+      can intercept that enemy
+    
+    Example:
+        move_to_position(700, 300)  # Move to blue flag spawn
+    """
+    if PredictionConfig.auto_aim and game_connection.player_id:
+        try:
+            aim = _auto_aim(x, y, game_connection.get_game_state_sync())
+        except Exception:
+            aim = None
+        if aim:
+            x, y, enemy_name, eta = aim
+            result = await _move_to_position(x, y)
+            return f"🎯 Auto-aimed at {enemy_name}: intercept ({x:.0f}, {y:.0f}) in ~{eta:.1f}s\n{result}"
+    return await _move_to_position(x, y)
+
+@mcp.tool
+@profile_tool
 @rate_limit
 async def attack() -> str:
     """
@@ -656,6 +1033,7 @@ async def attack() -> str:
         return f"Error attacking: {str(e)}"
 
 @mcp.tool
+@profile_tool
 @rate_limit
 async def send_team_message(message: str) -> str:
     """
@@ -716,6 +1094,135 @@ async def send_team_message(message: str) -> str:
         return f"Error sending team message: {str(e)}"
 
 @mcp.tool
+@profile_tool
+@rate_limit
+async def predict_enemy_positions(horizon_seconds: float = 0) -> str:
+    """
+    Predict where moving enemies will be after a delay, and where you can intercept them.
+    
+    Game state is a snapshot: moving players keep going at 5 pixels per frame
+    (about 300 pixels per second) while you decide. Use this to act on where
+    enemies will be rather than where they were.
+    
+    Args:
+        horizon_seconds (float): How far ahead to predict (0 uses the server default, usually 1.5s)
+    
+    Returns:
+        str: Current and predicted position of every living enemy, plus intercept points
+    
+    Details:
+    - Movement stops at the enemy's target or when blocked by the wall
+    - Flag carriers are assumed to head back to their base after their current target
+    - Intercept: earliest point where you can get within attack range by moving now
+    
+    Example:
+        predict_enemy_positions(2.0)
+    """
+    start_time = time.time()
+    agent_name = getattr(game_connection, 'player_name', 'unknown')
+    horizon = horizon_seconds if horizon_seconds > 0 else PredictionConfig.horizon
+    
+    if not game_connection.player_id:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        mcp_log("tool_executed", f"tool=predict_enemy_positions agent={agent_name} execution_time_ms={execution_time_ms} success=false details=not_connected")
+        return "Error: You must join the game first using join_game()"
+    
+    try:
+        game_state = game_connection.get_game_state_sync()
+        me = game_state.get("players", {}).get(game_connection.player_id, {})
+        mx, my = me.get("x", 0), me.get("y", 0)
+        
+        lines = [f"🔮 ENEMY PREDICTIONS (+{horizon:.1f}s):"]
+        for player in game_state.get("players", {}).values():
+            if player.get("team") == game_connection.player_team or not player.get("isAlive", True):
+                continue
+            px, py = player.get("x", 0), player.get("y", 0)
+            fx, fy, still_moving = predict_position(player, horizon, carrier_destination(player))
+            flag_info = " (carrying flag)" if player.get("hasFlag", False) else ""
+            if player.get("isMoving", False):
+                motion = f"→ ({fx:.0f},{fy:.0f})" + ("" if still_moving else " then stops")
+            else:
+                motion = "stationary"
+            line = f"  {player.get('name', 'unknown')} at ({px:.0f},{py:.0f}) {motion}{flag_info}"
+            intercept = solve_intercept(mx, my, player) if me else None
+            if intercept:
+                line += f"; intercept at ({intercept[0]:.0f},{intercept[1]:.0f}) in ~{intercept[2]:.1f}s"
+            lines.append(line)
+        if len(lines) == 1:
+            lines.append("  No living enemies")
+        
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        mcp_log("tool_executed", f"tool=predict_enemy_positions agent={agent_name} execution_time_ms={execution_time_ms} success=true")
+        
+        action_result = "\n".join(lines)
+        game_state_info = _format_game_state()
+        return f"{action_result}\n\n📊 CURRENT GAME STATE:\n{game_state_info}"
+    except Exception as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        mcp_log("tool_executed", f"tool=predict_enemy_positions agent={agent_name} execution_time_ms={execution_time_ms} success=false details={str(e)}")
+        return f"Error predicting enemy positions: {str(e)}"
+
+@mcp.tool
+@profile_tool
+@rate_limit
+async def intercept_enemy(player_name: str) -> str:
+    """
+    Move to intercept a moving enemy (for example the flag carrier heading home).
+    
+    Computes where the enemy will be when you can reach it and moves there,
+    using the same movement rules as move_to_position.
+    
+    Args:
+        player_name (str): Name of the enemy player to intercept
+    
+    Returns:
+        str: Intercept point and movement result, or error description
+    
+    Details:
+    - Aims for the earliest point where you get within attack range
+    - If the enemy cannot be caught within 10 seconds, moves towards its predicted position
+    - Call attack() once you are close
+    
+    Example:
+        intercept_enemy("BluePlayer1")
+    """
+    start_time = time.time()
+    agent_name = getattr(game_connection, 'player_name', 'unknown')
+    
+    if not game_connection.player_id:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        mcp_log("tool_executed", f"tool=intercept_enemy agent={agent_name} execution_time_ms={execution_time_ms} success=false details=not_connected")
+        return "Error: You must join the game first using join_game()"
+    
+    try:
+        game_state = game_connection.get_game_state_sync()
+        me = game_state.get("players", {}).get(game_connection.player_id)
+        enemy = _find_enemy(game_state, player_name)
+        if not me or not enemy:
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            mcp_log("tool_executed", f"tool=intercept_enemy agent={agent_name} execution_time_ms={execution_time_ms} success=false details=player_not_found")
+            return f"Error: No living enemy named '{player_name}'"
+        
+        intercept = solve_intercept(me.get("x", 0), me.get("y", 0), enemy)
+        if intercept:
+            x, y, eta = intercept
+            aim_info = f"🎯 Intercepting {player_name} at ({x:.0f}, {y:.0f}) in ~{eta:.1f}s"
+        else:
+            x, y, _ = predict_position(enemy, PredictionConfig.horizon, carrier_destination(enemy))
+            aim_info = f"🎯 {player_name} cannot be caught yet, heading to predicted position ({x:.0f}, {y:.0f})"
+        
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        mcp_log("tool_executed", f"tool=intercept_enemy agent={agent_name} execution_time_ms={execution_time_ms} success=true details=x={x:.1f},y={y:.1f}")
+        
+        result = await _move_to_position(x, y)
+        return f"{aim_info}\n{result}"
+    except Exception as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        mcp_log("tool_executed", f"tool=intercept_enemy agent={agent_name} execution_time_ms={execution_time_ms} success=false details={str(e)}")
+        return f"Error intercepting: {str(e)}"
+
+@mcp.tool
+@profile_tool
 @rate_limit
 async def disconnect_from_game() -> str:
     """
@@ -733,6 +1240,8 @@ async def disconnect_from_game() -> str:
     agent_name = getattr(game_connection, 'player_name', 'unknown')
     
     try:
+        game_connection.closing = True
+        game_connection.connected.clear()
         if game_connection.websocket:
             await game_connection.websocket.close()
         
@@ -762,6 +1271,40 @@ def parse_args():
                         help="Rate limit time period in seconds (default: 1.0)")
     parser.add_argument("--disable-rate-limit", action="store_true",
                         help="Disable rate limiting completely")
+    parser.add_argument("--server-url", default=os.getenv("GAME_SERVER_URL", "localhost:8080"),
+                        help="Game server host:port (default: $GAME_SERVER_URL or localhost:8080)")
+    parser.add_argument("--state-format", choices=["full", "compact"], default="full",
+                        help="Game state encoding in tool responses: full absolute listing or compact egocentric (default: full)")
+    parser.add_argument("--state-budget", type=int, default=StateFormatConfig.budget,
+                        help=f"Maximum characters of compact game state, 0 for no limit (default: {StateFormatConfig.budget})")
+    parser.add_argument("--state-budget-tokens", type=int,
+                        help="Compact game state budget in tokens (about 4 characters each), overrides --state-budget")
+    parser.add_argument("--prediction-horizon", type=float, default=PredictionConfig.horizon,
+                        help=f"Seconds to project enemy movement forward (default: {PredictionConfig.horizon})")
+    parser.add_argument("--auto-aim", action="store_true",
+                        help="Redirect move_to_position targets near a moving enemy to its intercept point")
+    parser.add_argument("--no-reconnect", action="store_true",
+                        help="Do not reconnect automatically when the game server connection drops")
+    parser.add_argument("--ping-interval", type=float, default=ReconnectConfig.ping_interval,
+                        help=f"Seconds between WebSocket keepalive pings (default: {ReconnectConfig.ping_interval})")
+    parser.add_argument("--reconnect-max-delay", type=float, default=ReconnectConfig.max_delay,
+                        help=f"Maximum reconnect backoff in seconds (default: {ReconnectConfig.max_delay})")
+    parser.add_argument("--reconnect-max-downtime", type=float, default=ReconnectConfig.max_downtime,
+                        help=f"Seconds to keep reconnecting before giving up, 0 to retry forever (default: {ReconnectConfig.max_downtime})")
+    parser.add_argument("--profile", choices=["off", "sampled", "deterministic"], default="off",
+                        help="Profile tool calls: low-overhead stack sampling or cProfile per tool (default: off)")
+    parser.add_argument("--profile-dir", default="logs/profiles",
+                        help="Directory for profile dumps, written at shutdown and on SIGUSR1 (default: logs/profiles)")
+    parser.add_argument("--profile-interval", type=float, default=5.0,
+                        help="Milliseconds between stack samples in sampled mode (default: 5)")
+    parser.add_argument("--profile-sample-rate", type=float, default=1.0,
+                        help="Fraction of tool calls profiled in deterministic mode (default: 1.0)")
+    parser.add_argument("--profile-top", type=int, default=20,
+                        help="Entries per top-N summary (default: 20)")
+    parser.add_argument("--trace-allocations", type=float, default=0.0, metavar="SECONDS",
+                        help="Track memory allocation growth over windows of this many seconds (default: off)")
+    parser.add_argument("--relay-socket", default=os.getenv("RELAY_SOCKET"),
+                        help="Receive frames and send actions through a local frame_relay.py Unix socket")
     return parser.parse_args()
 
 if __name__ == "__main__":
@@ -775,6 +1318,30 @@ if __name__ == "__main__":
     # Recreate rate limiter with new settings
     rate_limiter = RateLimiter(RateLimitConfig.calls, RateLimitConfig.period)
     
+    game_connection.set_server_url(args.server_url)
+    RelayConfig.socket_path = args.relay_socket
+    ReconnectConfig.enabled = not args.no_reconnect
+    ReconnectConfig.ping_interval = args.ping_interval
+    ReconnectConfig.ping_timeout = args.ping_interval
+    ReconnectConfig.max_delay = args.reconnect_max_delay
+    ReconnectConfig.max_downtime = args.reconnect_max_downtime
+    if args.profile != "off" or args.trace_allocations > 0:
+        profiler = ToolProfiler(
+            args.profile,
+            args.profile_dir,
+            sample_interval=args.profile_interval / 1000,
+            sample_rate=args.profile_sample_rate,
+            top_n=args.profile_top,
+            allocation_window=args.trace_allocations,
+            log=mcp_log,
+        )
+        profiler.start()
+    
+    PredictionConfig.horizon = args.prediction_horizon
+    PredictionConfig.auto_aim = args.auto_aim
+    StateFormatConfig.format = args.state_format
+    StateFormatConfig.budget = args.state_budget_tokens * 4 if args.state_budget_tokens is not None else args.state_budget
+    
     print(f"🎮 Starting Capture the Flag MCP Server")
     if RateLimitConfig.enabled:
         print(f"⏳ Rate limiting: {RateLimitConfig.calls} calls per {RateLimitConfig.period} seconds")
@@ -0,0 +1,126 @@
+"""
+Dead reckoning and intercept solving for capture the flag players.
+
+Game state frames are snapshots; by the time an agent acts on one, moving
+players have travelled well past the reported position. These helpers replay
+the game server's movement rules (main.go `updateGame`) to project players
+forward and to find where a chaser can reach a moving enemy.
+"""
+
+import math
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+# Movement rules mirrored from main.go
+MOVE_SPEED = 5.0  # pixels per tick
+TICK_SECONDS = 0.016  # 16 ms game loop ticker
+FIELD_WIDTH = 800.0
+FIELD_HEIGHT = 600.0
+WALL_LEFT, WALL_RIGHT, WALL_TOP, WALL_BOTTOM = 350.0, 450.0, 250.0, 350.0
+PLAYER_RADIUS = 15.0
+ATTACK_RANGE = 50.0
+
+# Scoring zones a flag carrier heads for (center of their own base)
+HOME_BASES = {"red": (50.0, 300.0), "blue": (750.0, 300.0)}
+
+
+def wall_collision(x: float, y: float) -> bool:
+    """Same check as Hub.checkWallCollision: player circle overlaps the center wall"""
+    return (x + PLAYER_RADIUS > WALL_LEFT and x - PLAYER_RADIUS < WALL_RIGHT and
+            y + PLAYER_RADIUS > WALL_TOP and y - PLAYER_RADIUS < WALL_BOTTOM)
+
+
+def trajectory(player: Dict[str, Any], continue_to: Optional[Tuple[float, float]] = None
+               ) -> Iterator[Tuple[float, float, bool]]:
+    """
+    Yield (x, y, is_moving) for each future tick, starting with the snapshot.
+
+    Players move MOVE_SPEED pixels per tick towards (targetX, targetY) and stop
+    on reaching it or when the next step would hit the wall. If `continue_to`
+    is given, a player that reaches its target keeps going there (e.g. a flag
+    carrier returning to base after an intermediate waypoint).
+
+    The generator is infinite; once the player stops it keeps yielding the
+    resting position.
+    """
+    x, y = float(player.get("x", 0)), float(player.get("y", 0))
+    moving = bool(player.get("isMoving", False)) and player.get("isAlive", True)
+    target_x = float(player.get("targetX", x))
+    target_y = float(player.get("targetY", y))
+    yield x, y, moving
+
+    while True:
+        if moving:
+            dx, dy = target_x - x, target_y - y
+            distance = math.hypot(dx, dy)
+            if distance <= MOVE_SPEED:
+                x, y = target_x, target_y
+                moving = False
+                if continue_to is not None and (x, y) != continue_to:
+                    target_x, target_y = continue_to
+                    continue_to = None
+                    moving = True
+            else:
+                new_x = x + dx / distance * MOVE_SPEED
+                new_y = y + dy / distance * MOVE_SPEED
+                if wall_collision(new_x, new_y):
+                    moving = False
+                else:
+                    x, y = new_x, new_y
+            x = max(0.0, min(FIELD_WIDTH, x))
+            y = max(0.0, min(FIELD_HEIGHT, y))
+        yield x, y, moving
+
+
+def predict_position(player: Dict[str, Any], horizon_seconds: float,
+                     continue_to: Optional[Tuple[float, float]] = None) -> Tuple[float, float, bool]:
+    """
+    Project a player `horizon_seconds` into the future.
+
+    Returns:
+        (x, y, is_moving) at the horizon
+    """
+    ticks = max(0, int(horizon_seconds / TICK_SECONDS))
+    for tick, position in enumerate(trajectory(player, continue_to)):
+        if tick >= ticks or not position[2]:
+            break
+    return position
+
+
+def distance_to_segment(px: float, py: float, ax: float, ay: float, bx: float, by: float) -> float:
+    """Distance from (px, py) to the segment from (ax, ay) to (bx, by)"""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def carrier_destination(player: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Where a flag carrier is expected to go after its current target"""
+    if player.get("hasFlag", False):
+        return HOME_BASES.get(player.get("team", ""))
+    return None
+
+
+def solve_intercept(from_x: float, from_y: float, enemy: Dict[str, Any], latency_seconds: float = 0.0,
+                    max_seconds: float = 10.0, reach: float = ATTACK_RANGE * 0.8
+                    ) -> Optional[Tuple[float, float, float]]:
+    """
+    Find the earliest point where a chaser starting at (from_x, from_y) can get
+    within `reach` of a moving enemy.
+
+    The chaser starts moving only after `latency_seconds` (decision and action
+    delay) and then moves in a straight line at MOVE_SPEED. Flag carriers are
+    assumed to head home after reaching their current target.
+
+    Returns:
+        (x, y, seconds) of the intercept, or None if not reachable in time
+    """
+    latency_ticks = latency_seconds / TICK_SECONDS
+    max_ticks = int(max_seconds / TICK_SECONDS)
+    for tick, (ex, ey, _) in enumerate(trajectory(enemy, carrier_destination(enemy))):
+        if tick > max_ticks:
+            return None
+        travel = max(0.0, tick - latency_ticks) * MOVE_SPEED
+        if math.hypot(ex - from_x, ey - from_y) <= travel + reach and not wall_collision(ex, ey):
+            return ex, ey, tick * TICK_SECONDS
+    return None
@@ -0,0 +1,103 @@
+"""Offline check of team coordinator mode: the stub policy run through a real pydantic-ai Agent."""
+
+import asyncio
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.function import FunctionModel
+
+import mcp_client
+from mcp_client import PLAYERS_CONFIG, TeamPlan, coordinator_prompt, stub_team_policy, team_state_json
+
+# Red carries the blue flag, Blue2 is dead and BluePlayer1 is in attack range of RedPlayer2
+GAME_STATE = {
+    "players": {
+        "r1": {"name": "RedPlayer1", "team": "red", "x": 600, "y": 300, "isAlive": True, "hasFlag": True},
+        "r2": {"name": "RedPlayer2", "team": "red", "x": 200, "y": 300, "isAlive": True, "hasFlag": False},
+        "b1": {"name": "BluePlayer1", "team": "blue", "x": 230, "y": 310, "isAlive": True, "hasFlag": False},
+        "b2": {"name": "BluePlayer2", "team": "blue", "x": 700, "y": 500, "isAlive": False, "hasFlag": False},
+    },
+    "redFlag": {"x": 50, "y": 300, "isAtBase": True, "carrier": ""},
+    "blueFlag": {"x": 600, "y": 300, "isAtBase": False, "carrier": "r1"},
+    "redScore": 1,
+    "blueScore": 0,
+    "redTeamMessages": [{"sender": "RedPlayer1", "message": "got it", "timestamp": 0}],
+}
+
+
+def test_stub_policy_returns_one_valid_action_per_player():
+    for team in ("red", "blue"):
+        names = [config["name"] for config in PLAYERS_CONFIG if config["team"] == team]
+        coordinator = Agent(FunctionModel(stub_team_policy), output_type=TeamPlan,
+                            system_prompt=coordinator_prompt.format(team=team, players=", ".join(names)))
+        plan = coordinator.run_sync(f"STATE: {team_state_json(GAME_STATE, team)}").output
+
+        assert sorted(action.player for action in plan.actions) == sorted(names)
+        for action in plan.actions:
+            if action.action == "move":
+                assert 0 <= action.x <= 800 and 0 <= action.y <= 600
+
+    red_plan = Agent(FunctionModel(stub_team_policy), output_type=TeamPlan).run_sync(
+        f"STATE: {team_state_json(GAME_STATE, 'red')}").output
+    actions = {action.player: action for action in red_plan.actions}
+    assert (actions["RedPlayer1"].action, actions["RedPlayer1"].x, actions["RedPlayer1"].y) == ("move", 50, 300)
+    assert actions["RedPlayer2"].action == "attack"
+
+
+class FakeServer:
+    """Stands in for a player's MCP server; join_game answers with `join_reply`"""
+    join_reply = "✅ Successfully joined"
+
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def call_tool(self, name, arguments):
+        self.calls.append(name)
+        return self.join_reply if name == "join_game" else "ok"
+
+
+@pytest.fixture
+def fake_servers(monkeypatch):
+    monkeypatch.setattr(mcp_client, "MCPServerStdio", FakeServer)
+    monkeypatch.setattr(FakeServer, "join_reply", FakeServer.join_reply)
+
+
+def red_configs():
+    return [config for config in PLAYERS_CONFIG if config["team"] == "red"]
+
+
+def test_run_team_survives_failed_steps(fake_servers, monkeypatch):
+    fetches = iter([GAME_STATE, ConnectionError("refused"), GAME_STATE, GAME_STATE])
+
+    def fetch_game_state(server_url):
+        state = next(fetches)
+        if isinstance(state, Exception):
+            raise state
+        return state
+
+    replies = iter([None, "bad", None])
+
+    def flaky_policy(messages, info):
+        if next(replies) == "bad":
+            raise ValueError("malformed reply")
+        return stub_team_policy(messages, info)
+
+    monkeypatch.setattr(mcp_client, "fetch_game_state", fetch_game_state)
+    stats = asyncio.run(mcp_client.run_team("red", red_configs(), "test", FunctionModel(flaky_policy), 3))
+
+    assert stats["failed_steps"] == 2
+    assert stats["llm_calls"] == 1
+    assert stats["captures"] == 1
+
+
+def test_run_team_stops_when_join_is_rejected(fake_servers, monkeypatch):
+    monkeypatch.setattr(FakeServer, "join_reply", "❌ Error joining game: name taken")
+    monkeypatch.setattr(mcp_client, "fetch_game_state", lambda server_url: GAME_STATE)
+    with pytest.raises(RuntimeError, match="join_game failed"):
+        asyncio.run(mcp_client.run_team("red", red_configs(), "test", FunctionModel(stub_team_policy), 3))
@@ -0,0 +1,39 @@
+"""Offline checks of auto-aim target matching."""
+
+import pytest
+
+import mcp_server
+
+
+@pytest.fixture
+def red_player(monkeypatch):
+    monkeypatch.setattr(mcp_server.game_connection, "player_id", "me")
+    monkeypatch.setattr(mcp_server.game_connection, "player_team", "red")
+
+
+def game_state(enemy):
+    return {
+        "players": {
+            "me": {"name": "R", "team": "red", "x": 150, "y": 300, "isAlive": True},
+            "enemy": dict({"name": "B", "team": "blue", "isAlive": True, "isMoving": True}, **enemy),
+        },
+        "redFlag": {"x": 50, "y": 300, "isAtBase": True},
+        "blueFlag": {"x": 750, "y": 300, "isAtBase": True},
+    }
+
+
+def test_target_on_enemy_path_is_redirected(red_player):
+    state = game_state({"x": 400, "y": 200, "targetX": 600, "targetY": 200})
+    aim = mcp_server._auto_aim(520, 210, state)
+    assert aim is not None and aim[2] == "B"
+
+
+def test_move_toward_own_base_is_not_hijacked(red_player):
+    state = game_state({"x": 400, "y": 200, "targetX": 600, "targetY": 200})
+    assert mcp_server._auto_aim(60, 180, state) is None
+    assert mcp_server._auto_aim(50, 230, state) is None
+
+
+def test_target_behind_retreating_enemy_is_not_redirected(red_player):
+    state = game_state({"x": 500, "y": 150, "targetX": 700, "targetY": 150})
+    assert mcp_server._auto_aim(400, 150, state) is None
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Run many capture the flag matches in parallel.
+
+Every match gets its own game server (on a free port), its own log files and
+its own MCP client process with one MCP server per player, so matches never
+share state. Concurrency is capped to the number of cores.
+
+Example:
+    uv run tournament.py --matches 8 --models claude-sonnet-4-20250514 gemini-2.5-flash
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import requests
+
+from log_analyzer import Analyzer, analyze
+from mcp_client import model as default_model, request_limit as default_request_limit
+
+# Seconds to wait for a game server to accept connections
+SERVER_START_TIMEOUT = 15
+# A server that loses a port race exits right after binding fails; it must
+# still be running this long after answering the health check
+SERVER_BIND_GRACE = 0.5
+# Fresh ports tried before a match gives up on starting its server
+SERVER_START_ATTEMPTS = 3
+# Seconds between game state polls while a match is running
+POLL_INTERVAL = 2.0
+
+
+def find_free_port() -> int:
+    """Ask the OS for a free TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def build_game_server(output_dir: str) -> str:
+    """Compile main.go once so matches don't each pay for `go run`"""
+    binary = os.path.join(output_dir, "ctf_server")
+    subprocess.run(["go", "build", "-o", binary, "main.go"], check=True)
+    return binary
+
+
+def fetch_game_state(port: int) -> Optional[Dict[str, Any]]:
+    try:
+        response = requests.get(f"http://localhost:{port}/game-state", timeout=2)
+        response.raise_for_status()
+        return response.json()
+    except Exception:
+        return None
+
+
+def stop_process(process: Optional[asyncio.subprocess.Process]):
+    """Terminate a process and everything it spawned (it runs in its own session)"""
+    if process is None or process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+async def wait_for_server(port: int, process: asyncio.subprocess.Process) -> bool:
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if process.returncode is not None:
+            return False
+        if await asyncio.to_thread(fetch_game_state, port) is not None:
+            # Another match may have grabbed the port between find_free_port and
+            # our bind, in which case the health check reached its server
+            await asyncio.sleep(SERVER_BIND_GRACE)
+            return process.returncode is None
+        await asyncio.sleep(0.2)
+    return False
+
+
+async def start_game_server(server_binary: str, match_dir: str, server_out
+                            ) -> Tuple[Optional[asyncio.subprocess.Process], int, Dict[str, str]]:
+    """Start a game server on a free port, retrying on a fresh port if it fails to come up"""
+    game_log = os.path.join(match_dir, "game_server.log")
+    mcp_log = os.path.join(match_dir, "mcp_server.log")
+    for _ in range(SERVER_START_ATTEMPTS):
+        port = find_free_port()
+        env = dict(os.environ, PORT=str(port), GAME_LOG_PATH=game_log, MCP_LOG_PATH=mcp_log)
+        server = await asyncio.create_subprocess_exec(
+            server_binary, env=env, stdout=server_out, stderr=subprocess.STDOUT,
+            start_new_session=True)
+        if await wait_for_server(port, server):
+            return server, port, env
+        stop_process(server)
+        await server.wait()
+    return None, port, env
+
+
+async def run_match(match_id: int, match_model: str, args, server_binary: str, run_dir: str,
+                    semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Run one isolated match and return its result row"""
+    async with semaphore:
+        match_dir = os.path.join(run_dir, f"match_{match_id:03d}")
+        os.makedirs(match_dir, exist_ok=True)
+        mcp_log = os.path.join(match_dir, "mcp_server.log")
+
+        result = {
+            "match": match_id,
+            "model": match_model,
+            "port": 0,
+            "status": "error",
+            "red_score": 0,
+            "blue_score": 0,
+            "winner": "",
+            "duration_s": 0.0,
+            "tool_calls": 0,
+            "rate_limit_hits": 0,
+        }
+        start_time = time.time()
+        server = client = None
+        try:
+            with open(os.path.join(match_dir, "server.out"), "wb") as server_out, \
+                 open(os.path.join(match_dir, "client.out"), "wb") as client_out:
+                server, port, env = await start_game_server(server_binary, match_dir, server_out)
+                result["port"] = port
+                if server is None:
+                    result["status"] = "server_failed"
+                    return result
+                print(f"▶️  Match {match_id} starting on port {port} ({match_model})")
+
+                client_args = ["--port", str(port), "--no-game-server",
+                               "--model", match_model, "--request-limit", str(args.request_limit)]
+                if args.team_mode:
+                    client_args.append("--team-mode")
+                if args.stub_model:
+                    client_args.append("--stub-model")
+                client = await asyncio.create_subprocess_exec(
+                    sys.executable, "mcp_client.py", *client_args,
+                    env=env, stdout=client_out, stderr=subprocess.STDOUT,
+                    start_new_session=True)
+
+                # The match ends when the agents are done, the game is over, or time runs out
+                state = None
+                while True:
+                    try:
+                        await asyncio.wait_for(client.wait(), timeout=POLL_INTERVAL)
+                        result["status"] = "agents_finished"
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+                    state = await asyncio.to_thread(fetch_game_state, port) or state
+                    if state and state.get("gameEnded"):
+                        result["status"] = "game_ended"
+                        break
+                    if time.time() - start_time > args.timeout:
+                        result["status"] = "timeout"
+                        break
+
+                state = await asyncio.to_thread(fetch_game_state, port) or state or {}
+                result["red_score"] = state.get("redScore", 0)
+                result["blue_score"] = state.get("blueScore", 0)
+                result["winner"] = state.get("winner", "")
+        finally:
+            stop_process(client)
+            stop_process(server)
+            for process in (client, server):
+                if process is not None:
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=5)
+                    except asyncio.TimeoutError:
+                        try:
+                            os.killpg(process.pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+            result["duration_s"] = round(time.time() - start_time, 1)
+
+        # Summarize the match's own MCP log
+        analyzer = Analyzer()
+        await asyncio.to_thread(analyze, [mcp_log], analyzer, 60, False)
+        report = analyzer.report()
+        for stats in report["agents"].values():
+            result["tool_calls"] += sum(t["calls"] for t in stats["tools"].values())
+            result["rate_limit_hits"] += stats["rate_limit_hits"]
+
+        print(f"⏹️  Match {match_id} {result['status']}: Red {result['red_score']} - "
+              f"Blue {result['blue_score']} in {result['duration_s']}s")
+        return result
+
+
+def print_results(results: List[Dict[str, Any]]):
+    columns = ["match", "model", "status", "red_score", "blue_score", "winner",
+               "duration_s", "tool_calls", "rate_limit_hits"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in results)) for c in columns}
+    print("\n" + "  ".join(c.ljust(widths[c]) for c in columns))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def write_results(results: List[Dict[str, Any]], run_dir: str):
+    with open(os.path.join(run_dir, "results.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    with open(os.path.join(run_dir, "results.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+async def main(args):
+    run_dir = os.path.join(args.output_dir, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(run_dir, exist_ok=True)
+
+    concurrency = min(args.concurrency or os.cpu_count() or 1, os.cpu_count() or 1, args.matches)
+    print(f"🏆 Tournament: {args.matches} matches, {concurrency} at a time, results in {run_dir}")
+
+    with tempfile.TemporaryDirectory() as build_dir:
+        server_binary = await asyncio.to_thread(build_game_server, build_dir)
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            run_match(i, args.models[i % len(args.models)], args, server_binary, run_dir, semaphore)
+            for i in range(args.matches)
+        ]
+        results = await asyncio.gather(*tasks)
+
+    print_results(results)
+    write_results(results, run_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Capture the Flag parallel tournament runner")
+    parser.add_argument("--matches", type=int, default=4,
+                        help="Number of matches to play (default: 4)")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Maximum matches running at once (default and upper bound: number of cores)")
+    parser.add_argument("--models", nargs="+", default=[default_model],
+                        help="Models to compare, assigned to matches round-robin")
+    parser.add_argument("--request-limit", type=int, default=default_request_limit,
+                        help=f"Maximum model requests per agent (default: {default_request_limit})")
+    parser.add_argument("--team-mode", action="store_true",
+                        help="Run matches with one coordinator model call per team per step")
+    parser.add_argument("--stub-model", action="store_true",
+                        help="With --team-mode, use the offline heuristic instead of an LLM")
+    parser.add_argument("--timeout", type=float, default=1200,
+                        help="Maximum seconds per match (default: 1200)")
+    parser.add_argument("--output-dir", default="logs/tournament",
+                        help="Directory for per-match logs and the results table (default: logs/tournament)")
+    args = parser.parse_args()
+    if args.matches < 1:
+        parser.error("--matches must be at least 1")
+    if args.stub_model and not args.team_mode:
+        parser.error("--stub-model requires --team-mode")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))